@@ -0,0 +1,102 @@
+# action_log.py
+
+import os
+import json
+import time
+import uuid
+
+LOG_FILE = "agent_log.jsonl"
+
+
+class ActionLogWriter:
+    """
+    Append-only JSON Lines log of agent frames.
+
+    Entries are buffered in memory and written `flush_every` at a time, so
+    logging costs one write per batch rather than rewriting the whole file.
+    With `max_bytes` or `max_frames` set, the current file is rolled over
+    to agent_log.1.jsonl, agent_log.2.jsonl, ... once it reaches that size,
+    and a fresh file is started.
+
+    Every writer is one session: each time it opens a file it first writes
+    a header line, {"session": id, "started": unix time, "segment": n}, so
+    runs appended to the same log can be told apart. Readers skip these
+    lines (see is_session_header).
+    """
+
+    def __init__(self, path=LOG_FILE, flush_every=500, max_bytes=None, max_frames=None):
+        self.path = path
+        self.flush_every = flush_every
+        self.max_bytes = max_bytes
+        self.max_frames = max_frames
+        self.rows_written = 0
+        self.session = uuid.uuid4().hex[:12]
+        self._buffer = []
+        self._segment = 0
+        self._segments_opened = 0
+        self._open()
+
+    def _open(self):
+        self._file = open(self.path, "a")
+        header = json.dumps({"session": self.session, "started": time.time(), "segment": self._segments_opened}) + "\n"
+        self._file.write(header)
+        self._segments_opened += 1
+        self._bytes = self._file.tell()
+        self._frames = 0
+
+    def write(self, entry):
+        self._buffer.append(entry)
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            data = "".join(json.dumps(entry) + "\n" for entry in self._buffer)
+            self._file.write(data)
+            self._bytes += len(data)
+            self._frames += len(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer.clear()
+        self._file.flush()
+
+        if (self.max_bytes and self._bytes >= self.max_bytes) or \
+           (self.max_frames and self._frames >= self.max_frames):
+            self.rotate()
+
+    def rotate(self):
+        """Close the current file under the next free segment name and start a new one."""
+        self._file.close()
+        stem, ext = os.path.splitext(self.path)
+        while True:
+            self._segment += 1
+            segment_path = f"{stem}.{self._segment}{ext}"
+            if not os.path.exists(segment_path):
+                break
+        os.replace(self.path, segment_path)
+        self._open()
+        return segment_path
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def is_session_header(entry):
+    """True for the line an ActionLogWriter starts each file with."""
+    return "session" in entry and "state" not in entry
+
+
+def read_log(path):
+    """Load every entry of a JSON (list) or JSON Lines log into a list."""
+    with open(path, "r") as f:
+        if path.endswith(".jsonl"):
+            entries = (json.loads(line) for line in f if line.strip())
+            return [entry for entry in entries if not is_session_header(entry)]
+        return json.load(f)
@@ -1,229 +1,412 @@
+import os
 import pygame
-import random
 import json
-import math
+import numpy as np
+from collections import deque
 from settings import *
-from emotion_engine import evaluate_emotion
-from policy_engine import evaluate_policy
-
-class Agent:
-    def __init__(self):
-        self.x = SCREEN_WIDTH // 2
-        self.y = SCREEN_HEIGHT // 2
-        self.radius = 12
-        self.colour = TURTLE_COLOUR
-
-        # Internal state
-        self.hunger = 0
-        self.health = 100
-        self.energy = 100
-        self.stimulation = 50
-        self.fear_level = 0
-
-        # Behaviour
-        self.direction = pygame.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()
-        self.speed = 0
-        self.emotion = "Idle"
-        self.action = "idle"
-
-        # Tracking
-        self.prev_emotion = "Idle"
-        self.emotion_log = []
-        self.action_log = []
-        self.frame_count = 0
+from emotion_engine import evaluate_emotion_batch
+from policy_engine import evaluate_policy_batch, FEATURE_NAMES
+from population import Population, EntityView, random_directions
+from spatial import SpatialGrid, DIRECT_PAIRS, pairwise_distances
+
+ACTION_SPEEDS = {
+    "flee": 2.5,
+    "seek_food": 2,
+    "rest": 0,
+    "wander": 1,
+    "idle": 0.2,
+    "do_nothing": 0
+}
+
+# current_target kinds
+NO_TARGET, PREY_TARGET, PREDATOR_TARGET = 0, 1, 2
+
+
+class Agent(EntityView):
+    """View of one agent in an AgentPopulation, used for rendering and the HUD."""
+
+    __slots__ = ()
+
+    def _state(self, name):
+        return float(getattr(self.population, name)[self._live_row()])
+
+    hunger = property(lambda self: self._state("hunger"))
+    energy = property(lambda self: self._state("energy"))
+    health = property(lambda self: self._state("health"))
+    stimulation = property(lambda self: self._state("stimulation"))
+    fear_level = property(lambda self: self._state("fear_level"))
+
+    @property
+    def emotion(self):
+        return str(self.population.emotion[self._live_row()])
+
+    @property
+    def action(self):
+        return str(self.population.action[self._live_row()])
 
-        self.last_health = self.health
-        self.last_energy = self.energy
+    @property
+    def colour(self):
+        return EMOTION_COLOURS.get(self.emotion, TURTLE_COLOUR)
 
-    def update(self, prey_list, predator_list):
+    @property
+    def current_target(self):
+        row = self.row
+        return self.population.target_of(row) if row >= 0 else None
+
+    def draw(self, screen, font):
+        radius = int(self.radius)
+        pygame.draw.circle(screen, self.colour, (int(self.x), int(self.y)), radius)
+        label = font.render(f"{self.emotion} / {self.action}", True, (255, 255, 255))
+        screen.blit(label, (self.x - 20, self.y - 25))
+
+        # Health bar
+        bar_width = 40
+        bar_height = 6
+        health_ratio = self.health / 100
+        colour = (0, 255, 0) if self.health > 40 else (255, 165, 0) if self.health > 20 else (255, 0, 0)
+        bar_x = self.x - bar_width // 2
+        bar_y = self.y + radius + 6
+
+        # Draw target line in debug mode
+        target = self.current_target
+        if target:
+            start = (int(self.x), int(self.y))
+            end = (int(target.x), int(target.y))
+            pygame.draw.line(screen, (200, 200, 255), start, end, 1)
+
+        pygame.draw.rect(screen, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height))
+        pygame.draw.rect(screen, colour, (bar_x, bar_y, int(bar_width * health_ratio), bar_height))
+
+    def save_action_log(self, filename="agent_log.json"):
+        return self.population.save_action_log(filename)
+
+
+class AgentPopulation(Population):
+    """
+    Any number of agents whose internal state lives in arrays. Each frame
+    the whole population is classified with one evaluate_emotion_batch and
+    one evaluate_policy_batch call; only targeting and eating, which depend
+    on each agent's surroundings, loop over agents.
+    """
+
+    COLUMNS = {
+        **Population.COLUMNS,
+        "hunger": float,
+        "energy": float,
+        "health": float,
+        "stimulation": float,
+        "fear_level": float,
+        "last_health": float,
+        "last_energy": float,
+        "emotion": "U10",
+        "prev_emotion": "U10",
+        "action": "U10",
+        "target_kind": np.int8,
+        "target_id": np.int64,
+        "food_eaten": np.int64,
+    }
+    view_class = Agent
+
+    def __init__(self, count=1, rng=None):
+        super().__init__(capacity=max(1, count), rng=rng)
+        self.frame_count = 0
+        # Recent history only; attach an ActionLogWriter to keep everything on disk
+        self.emotion_log = deque(maxlen=LOG_RETAIN_ROWS)
+        self.action_log = deque(maxlen=LOG_RETAIN_ROWS)
+        self.rows_logged = 0
+        self.log_writer = None
+        # Set by FrameProfiler.attach to time the update stages
+        self.profiler = None
+        self._prey = None
+        self._predators = None
+        self.spawn(count)
+
+    def spawn(self, n):
+        """Add `n` agents; the first agent of a population starts mid-screen."""
+        if n <= 0:
+            return np.empty(0, dtype=int)
+        radius = 12
+        x = self.rng.uniform(radius, SCREEN_WIDTH - radius, n)
+        y = self.rng.uniform(radius, SCREEN_HEIGHT - radius, n)
+        if not len(self):
+            x[0], y[0] = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
+        d = random_directions(n, self.rng)
+        return self.add(
+            x=x, y=y, dx=d[:, 0], dy=d[:, 1],
+            speed=0,
+            radius=radius,
+            hunger=0,
+            health=100,
+            energy=100,
+            stimulation=50,
+            fear_level=0,
+            last_health=100,
+            last_energy=100,
+            emotion="Idle",
+            prev_emotion="Idle",
+            action="idle",
+            target_kind=NO_TARGET,
+            target_id=-1,
+            food_eaten=0,
+        )
+
+    def target_of(self, row):
+        """The prey or predator view agent `row` is heading for, if any."""
+        kind = self.target_kind[row]
+        population = {PREY_TARGET: self._prey, PREDATOR_TARGET: self._predators}.get(kind)
+        if population is None:
+            return None
+        target_row = population.row_of(self.target_id[row])
+        return population[target_row] if target_row >= 0 else None
+
+    def update(self, prey_list, predator_list, prey_grid=None, predator_grid=None):
+        """
+        Advance every agent one frame. `prey_grid` / `predator_grid` are
+        spatial grids built over the current populations (indices match
+        rows); they are built here when the caller does not supply them.
+
+        Small worlds (see DIRECT_PAIRS) skip the grids: every distance the
+        frame needs then comes from a few all-pairs NumPy arrays, which is
+        far cheaper than building grids and querying them one entity at a
+        time.
+        """
+        profiler = self.profiler
         self.frame_count += 1
+        self._prey = prey_list
+        self._predators = predator_list
 
         # Internal updates
-        self.hunger = min(100, self.hunger + 0.1)
-        if self.hunger >= 100:
-            self.health -= 0.1
+        self.hunger[:] = np.minimum(100, self.hunger + 0.1)
+        self.health[self.hunger >= 100] -= 0.1
 
-        if self.emotion in ["Hungry", "Fearful", "Curious"]:
-            self.energy -= 0.2
-        else:
-            self.energy += 0.1
-        self.energy = max(0, min(100, self.energy))
-        self.stimulation = max(0, self.stimulation - 0.05)
+        active = (self.emotion == "Hungry") | (self.emotion == "Fearful") | (self.emotion == "Curious")
+        self.energy[:] = np.clip(np.where(active, self.energy - 0.2, self.energy + 0.1), 0, 100)
+        self.stimulation[:] = np.maximum(0, self.stimulation - 0.05)
 
-        if self.energy <= 0:
-            self.health -= 0.1
+        self.health[self.energy <= 0] -= 0.1
 
-        if self.hunger >= 50 and self.action in ["idle", "rest"]:
-            self.health = min(100, self.health + 0.5)
+        resting = (self.hunger >= 50) & ((self.action == "idle") | (self.action == "rest"))
+        self.health[resting] = np.minimum(100, self.health[resting] + 0.5)
 
-        if self.health <= 0:
-            self.health = 0
-            self.emotion = "Dead"
-            self.speed = 0
+        dead = self.health <= 0
+        self.health[dead] = 0
+        self.emotion[dead] = "Dead"
+        self.speed[dead] = 0
+        live = np.flatnonzero(~dead)
+        if not len(live):
             return
 
+        n_prey, n_predators = len(prey_list), len(predator_list)
+        direct = (len(live) * max(n_prey, n_predators) <= DIRECT_PAIRS
+                  and n_prey * n_predators <= DIRECT_PAIRS)
+        if direct:
+            ax, ay = self.x[live], self.y[live]
+            predator_dist = pairwise_distances(ax, ay, predator_list.x, predator_list.y)
+            prey_dist = pairwise_distances(ax, ay, prey_list.x, prey_list.y)
+        else:
+            if prey_grid is None:
+                prey_grid = SpatialGrid().build_from(prey_list)
+            if predator_grid is None:
+                predator_grid = SpatialGrid().build_from(predator_list)
+            agent_grid = SpatialGrid().build(self.positions()[live], self.radius[live])
+
         # Detect predators
-        predators_nearby = any(
-            pygame.Vector2(self.x, self.y).distance_to(p.get_position()) < 100
-            for p in predator_list
-        )
-        if predators_nearby:
-            self.fear_level = 100
+        if direct:
+            predators_nearby = (predator_dist < 100).any(axis=1)
+        else:
+            predators_nearby = np.zeros(len(live), dtype=bool)
+            for px, py in zip(predator_list.x, predator_list.y):
+                idx, dist = agent_grid.query_radius(px, py, 100)
+                predators_nearby[idx[dist < 100]] = True
+        self.fear_level[live[predators_nearby]] = 100
 
         # State and context
-        state = {
-            "hunger": self.hunger,
-            "energy": self.energy,
-            "health": self.health,
-            "stimulation": self.stimulation,
-            "fear_level": self.fear_level
-        }
+        state = {name: getattr(self, name)[live].copy() for name in FEATURE_NAMES}
         context = {
-            "novelty_trigger": random.random() < 0.005,
+            "novelty_trigger": self.rng.random(len(live)) < 0.005,
             "prey_visible": bool(prey_list),
             "predators_nearby": predators_nearby
         }
+        if profiler is not None:
+            profiler.lap("agent.sense")
 
         # Step 1: Emotion
-        new_emotion = evaluate_emotion(state, context)
-        if new_emotion != self.prev_emotion:
-            self.emotion_log.append({
+        new_emotion = evaluate_emotion_batch(state, context)
+        for i in np.flatnonzero(new_emotion != self.prev_emotion[live]):
+            row = live[i]
+            self.emotion_log.append(self._log_entry(row, {
                 "frame": self.frame_count,
-                "from": self.prev_emotion,
-                "to": new_emotion,
-                "state": state.copy()
-            })
-            self.prev_emotion = new_emotion
-        self.emotion = new_emotion
+                "from": str(self.prev_emotion[row]),
+                "to": str(new_emotion[i]),
+                "state": {name: float(state[name][i]) for name in FEATURE_NAMES}
+            }))
+        self.prev_emotion[live] = new_emotion
+        self.emotion[live] = new_emotion
+        if profiler is not None:
+            profiler.lap("agent.emotion")
 
         # Step 2: Action
-        self.action = evaluate_policy(state, context)
+        action = evaluate_policy_batch(state, context)
+        self.action[live] = action
+        if profiler is not None:
+            profiler.lap("agent.policy")
 
         # Step 3: Reward
-        reward = 0
-        if self.health > self.last_health:
-            reward += 1
-        if self.health < self.last_health:
-            reward -= 1
-        if self.energy < self.last_energy:
-            reward -= 0.5
-
-        self.last_health = self.health
-        self.last_energy = self.energy
-
-        self.action_log.append({
-            "frame": self.frame_count,
-            "state": state.copy(),
-            "emotion": self.emotion,
-            "action": self.action,
-            "reward": reward
-        })
+        health = self.health[live]
+        energy = self.energy[live]
+        reward = (
+            (health > self.last_health[live]).astype(float)
+            - (health < self.last_health[live])
+            - 0.5 * (energy < self.last_energy[live])
+        )
+        self.last_health[live] = health
+        self.last_energy[live] = energy
 
         # Step 4: Speed
-        self.speed = {
-            "flee": 2.5,
-            "seek_food": 2,
-            "rest": 0,
-            "wander": 1,
-            "idle": 0.2,
-            "do_nothing": 0
-        }.get(self.action, 1)
-
-        # Smarter prey targeting
-        def is_safe_prey(prey, predators, radius=80):
-            return all(pygame.Vector2(prey.x, prey.y).distance_to(p.get_position()) > radius for p in predators)
-
-        nearest_prey = None
-        nearest_distance = float('inf')
-
-        for prey in prey_list:
-            if not is_safe_prey(prey, predator_list):
-                continue
-            distance = pygame.Vector2(self.x, self.y).distance_to(prey.get_position())
-            if distance < nearest_distance:
-                nearest_prey = prey
-                nearest_distance = distance
+        self.speed[live] = [ACTION_SPEEDS.get(a, 1) for a in action]
 
-        # Step 5: Direction logic
-        if self.action == "seek_food" and nearest_prey:
-            direction = (pygame.Vector2(nearest_prey.x, nearest_prey.y) - pygame.Vector2(self.x, self.y)).normalize()
-            jitter = pygame.Vector2(random.uniform(-0.2, 0.2), random.uniform(-0.2, 0.2))
-            self.direction = (direction + jitter).normalize()
-
-        elif self.action == "flee" and predator_list:
-            closest = min(predator_list, key=lambda p: pygame.Vector2(self.x, self.y).distance_to(p.get_position()))
-            away = pygame.Vector2(self.x, self.y) - closest.get_position()
-            self.direction = away.normalize() if away.length() > 0 else self.direction
-
-        elif self.action == "wander" and random.random() < 0.05:
-            self.direction = pygame.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()
+        # Smarter prey targeting: nearest prey with no predator within 80px
+        if direct:
+            safe = ~(pairwise_distances(prey_list.x, prey_list.y, predator_list.x, predator_list.y) <= 80).any(axis=1)
+            safe_dist = np.where(safe, prey_dist, np.inf)
+        else:
+            safe = np.ones(n_prey, dtype=bool)
+            for px, py in zip(predator_list.x, predator_list.y):
+                unsafe, _ = prey_grid.query_radius(px, py, 80)
+                safe[unsafe] = False
 
-        elif self.action in ["idle", "rest"] and random.random() < 0.01:
-            self.direction = pygame.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()
+        # Step 5: Direction logic
+        self.target_kind[live] = NO_TARGET
+        seeking = action == "seek_food"
+        for i in np.flatnonzero(seeking):
+            row = live[i]
+            if direct:
+                nearest = int(np.argmin(safe_dist[i])) if n_prey and safe_dist[i].min() < np.inf else -1
+            else:
+                nearest, _ = prey_grid.nearest(self.x[row], self.y[row], mask=safe)
+            if nearest < 0:
+                continue
+            to_x = prey_list.x[nearest] - self.x[row]
+            to_y = prey_list.y[nearest] - self.y[row]
+            length = np.hypot(to_x, to_y)
+            if length > 0:
+                jitter_x, jitter_y = self.rng.uniform(-0.2, 0.2, 2)
+                self._set_direction(row, to_x / length + jitter_x, to_y / length + jitter_y)
+            self.target_kind[row] = PREY_TARGET
+            self.target_id[row] = prey_list.id[nearest]
+
+        fleeing = action == "flee"
+        if len(predator_list):
+            for i in np.flatnonzero(fleeing):
+                row = live[i]
+                if direct:
+                    closest = int(np.argmin(predator_dist[i]))
+                else:
+                    closest, _ = predator_grid.nearest(self.x[row], self.y[row])
+                self._set_direction(row, self.x[row] - predator_list.x[closest], self.y[row] - predator_list.y[closest])
+                self.target_kind[row] = PREDATOR_TARGET
+                self.target_id[row] = predator_list.id[closest]
+
+        draw = self.rng.random(len(live))
+        wander = (action == "wander") & (draw < 0.05)
+        idle = ((action == "idle") | (action == "rest")) & (draw < 0.01)
+        turning = live[wander | idle]
+        if len(turning):
+            d = random_directions(len(turning), self.rng)
+            self.dx[turning] = d[:, 0]
+            self.dy[turning] = d[:, 1]
+
+        if profiler is not None:
+            profiler.lap("agent.targeting")
 
         # Bounds
-        if self.x <= self.radius or self.x >= SCREEN_WIDTH - self.radius:
-            self.direction.x *= -1
-        if self.y <= self.radius or self.y >= SCREEN_HEIGHT - self.radius:
-            self.direction.y *= -1
+        self.dx[(self.x <= self.radius) | (self.x >= SCREEN_WIDTH - self.radius)] *= -1
+        self.dy[(self.y <= self.radius) | (self.y >= SCREEN_HEIGHT - self.radius)] *= -1
 
         # Eat prey
-        for prey in prey_list[:]:
-            if pygame.Vector2(self.x, self.y).distance_to(prey.get_position()) < self.radius + prey.radius:
-                if self.hunger >= 50:
-                    prey_list.remove(prey)
-                    self.hunger = max(0, self.hunger - 20)
-                    self.stimulation = min(100, self.stimulation + 10)
-                    self.energy = min(100, self.energy + 10)
-                    self.action_log[-1]["reward"] += 2
-                    break
+        eaten = []
+        for i in np.flatnonzero(self.hunger[live] >= 50):
+            row = live[i]
+            if direct:
+                touching = np.flatnonzero(prey_dist[i] < self.radius[row] + prey_list.radius)
+            else:
+                touching = prey_grid.query_contacts(self.x[row], self.y[row], self.radius[row])
+            if eaten:
+                touching = touching[~np.isin(touching, eaten)]
+            if len(touching):
+                eaten.append(int(touching.min()))
+                self.hunger[row] = max(0, self.hunger[row] - 20)
+                self.stimulation[row] = min(100, self.stimulation[row] + 10)
+                self.energy[row] = min(100, self.energy[row] + 10)
+                self.food_eaten[row] += 1
+                reward[i] += 2
 
         # Predator contact
-        for predator in predator_list:
-            if pygame.Vector2(self.x, self.y).distance_to(predator.get_position()) < self.radius + predator.radius:
-                self.health -= 0.5
-
-        self.fear_level = max(0, self.fear_level - 1)
-
-        # Move
-        self.x += self.direction.x * self.speed
-        self.y += self.direction.y * self.speed
-        
-        self.x = max(self.radius, min(SCREEN_WIDTH - self.radius, self.x))
-        self.y = max(self.radius, min(SCREEN_HEIGHT - self.radius, self.y))
-
-        # Target tracking
-        self.current_target = nearest_prey if self.action == "seek_food" else None
-        if self.action == "flee":
-            self.current_target = closest  # predator object
-
-
-        # Colour
-        self.colour = EMOTION_COLOURS.get(self.emotion, TURTLE_COLOUR)
-
-    def draw(self, screen, font):
-        pygame.draw.circle(screen, self.colour, (int(self.x), int(self.y)), self.radius)
-        label = font.render(f"{self.emotion} / {self.action}", True, (255, 255, 255))
-        screen.blit(label, (self.x - 20, self.y - 25))
+        if direct:
+            hits = (predator_dist < predator_list.radius + self.radius[live][:, None]).sum(axis=1)
+            self.health[live] -= 0.5 * hits
+        else:
+            for px, py, pr in zip(predator_list.x, predator_list.y, predator_list.radius):
+                idx, dist = agent_grid.query_radius(px, py, pr + self.radius.max())
+                hit = live[idx[dist < pr + self.radius[live[idx]]]]
+                np.subtract.at(self.health, hit, 0.5)
+
+        self.rows_logged += len(live)
+        for i, row in enumerate(live):
+            entry = self._log_entry(row, {
+                "frame": self.frame_count,
+                "state": {name: float(state[name][i]) for name in FEATURE_NAMES},
+                "emotion": str(new_emotion[i]),
+                "action": str(action[i]),
+                "reward": float(reward[i])
+            })
+            self.action_log.append(entry)
+            if self.log_writer:
+                self.log_writer.write(entry)
 
-        # Health bar
-        bar_width = 40
-        bar_height = 6
-        health_ratio = self.health / 100
-        colour = (0, 255, 0) if self.health > 40 else (255, 165, 0) if self.health > 20 else (255, 0, 0)
-        bar_x = self.x - bar_width // 2
-        bar_y = self.y + self.radius + 6
+        if eaten:
+            prey_list.kill(eaten)
 
-        # Draw target line in debug mode
-        if hasattr(self, "current_target") and self.current_target:
-            start = (int(self.x), int(self.y))
-            end = (int(self.current_target.x), int(self.current_target.y))
-            pygame.draw.line(screen, (200, 200, 255), start, end, 1)
+        self.fear_level[live] = np.maximum(0, self.fear_level[live] - 1)
 
-        pygame.draw.rect(screen, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height))
-        pygame.draw.rect(screen, colour, (bar_x, bar_y, int(bar_width * health_ratio), bar_height))
+        # Move
+        self.x[live] += self.dx[live] * self.speed[live]
+        self.y[live] += self.dy[live] * self.speed[live]
+        self.clamp_to(SCREEN_WIDTH, SCREEN_HEIGHT)
+        if profiler is not None:
+            profiler.lap("agent.contacts")
+
+    def _set_direction(self, row, dx, dy):
+        length = np.hypot(dx, dy)
+        if length > 0:
+            self.dx[row], self.dy[row] = dx / length, dy / length
+
+    def _log_entry(self, row, entry):
+        # Single-agent logs keep the original schema; larger populations tag the agent
+        if len(self) > 1:
+            entry = {"agent": int(self.id[row]), **entry}
+        return entry
 
     def save_action_log(self, filename="agent_log.json"):
+        """
+        Flush the streaming log if one is attached; otherwise dump the
+        retained entries to `filename`. Only the last LOG_RETAIN_ROWS
+        entries are kept in memory, so once older ones have been dropped
+        an existing `filename` is left alone rather than overwritten with
+        that tail. Returns the path written, or None.
+        """
+        if self.log_writer:
+            self.log_writer.flush()
+            print(f"[LOG] Flushed action log ({self.log_writer.rows_written} entries) to '{self.log_writer.path}'")
+            return self.log_writer.path
+        dropped = self.rows_logged - len(self.action_log)
+        if dropped > 0:
+            if os.path.exists(filename):
+                print(f"[LOG] Not overwriting '{filename}' with only the last {len(self.action_log)} of "
+                      f"{self.rows_logged} entries; attach an ActionLogWriter to keep the full log")
+                return None
+            print(f"[LOG] Only the last {len(self.action_log)} of {self.rows_logged} entries are still in memory")
         with open(filename, 'w') as f:
-            json.dump(self.action_log, f, indent=2)
+            json.dump(list(self.action_log), f, indent=2)
         print(f"[LOG] Saved action log with {len(self.action_log)} entries to '{filename}'")
+        return filename
@@ -0,0 +1,364 @@
+# benchmark.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+import numpy as np
+
+BASELINE_FILE = "benchmark_baseline.json"
+THRESHOLD = 0.25  # a benchmark regresses when it is this much slower than the baseline
+# Results under this many seconds per operation jitter by tens of percent
+# between identical runs, so they only regress past the wider threshold
+MIN_SECONDS = 0.001
+NOISY_THRESHOLD = 1.0
+# Baselines only mean something on the machine that recorded them
+MACHINE_KEYS = ["machine", "processor", "cpus"]
+SEED = 1234
+
+# (prey, predators, agents) -> frames to time
+QUICK_WORLDS = {(20, 3, 1): 1000, (1000, 10, 10): 200, (10000, 100, 500): 10}
+FULL_WORLDS = {(20, 3, 1): 5000, (200, 10, 10): 2000, (1000, 30, 50): 500, (10000, 100, 500): 50}
+QUICK_TRAIN_ROWS = [10_000, 100_000]
+FULL_TRAIN_ROWS = [10_000, 100_000, 1_000_000, 10_000_000]
+QUICK_VERSIONS = [10, 100, 1000]
+FULL_VERSIONS = [10, 100, 1000, 10000]
+
+EMOTIONS = ["Idle", "Hungry", "Fearful", "Curious", "Bored", "Exhausted", "Dead"]
+ACTIONS = ["flee", "seek_food", "rest", "wander", "idle", "do_nothing"]
+
+
+def best_of(fn, repeat=7, number=1):
+    """
+    Fastest of `repeat` timings of `number` back-to-back calls, in seconds.
+    The minimum is the measurement least disturbed by the rest of the
+    machine; `number` lifts sub-millisecond calls above timer noise.
+    """
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def result(seconds, per=1, **params):
+    """Seconds per operation (lower is better), with the parameters that produced it."""
+    return {"seconds": seconds / per, "per_sec": per / seconds if seconds > 0 else float("inf"), **params}
+
+
+@contextmanager
+def scratch_dir():
+    """Run in a temporary working directory, so models/, plots/ and .cache/ are throwaway."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        os.chdir(tmp)
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+def synthetic_states(n, rng):
+    return {
+        "hunger": rng.uniform(0, 100, n),
+        "energy": rng.uniform(0, 100, n),
+        "health": rng.uniform(0, 100, n),
+        "stimulation": rng.uniform(0, 100, n),
+        "fear_level": rng.choice([0.0, 100.0], n),
+    }
+
+
+# ========== SIMULATION ========== #
+def bench_world(worlds):
+    from world import World
+
+    results = {}
+    for (prey, predators, agents), frames in worlds.items():
+        times = []
+        for _ in range(3):
+            # A fresh seeded world each time, so every repeat steps the same frames
+            world = World(num_prey=prey, num_predators=predators, num_agents=agents, seed=SEED)
+            world.prey.max_size = max(world.prey.max_size, prey)
+            started = time.perf_counter()
+            world.run(frames)
+            times.append(time.perf_counter() - started)
+        results[f"world_step/{prey}x{predators}x{agents}"] = result(min(times), frames, frames=frames)
+    return results
+
+
+def bench_engines(batch=1000, calls=2000):
+    from emotion_engine import evaluate_emotion, evaluate_emotion_batch
+    from policy_engine import evaluate_policy, evaluate_policy_batch, registry
+
+    registry.active()  # load the model outside the timings
+    rng = np.random.default_rng(SEED)
+    states = synthetic_states(batch, rng)
+    context = {"novelty_trigger": rng.random(batch) < 0.005, "prey_visible": True,
+               "predators_nearby": states["fear_level"] > 0}
+    rows = [{name: float(values[i % batch]) for name, values in states.items()} for i in range(calls)]
+    row_contexts = [{"novelty_trigger": bool(context["novelty_trigger"][i % batch]), "prey_visible": True,
+                     "predators_nearby": bool(context["predators_nearby"][i % batch])} for i in range(calls)]
+
+    def scalar(fn):
+        return lambda: [fn(state, ctx) for state, ctx in zip(rows, row_contexts)]
+
+    return {
+        "evaluate_emotion/call": result(best_of(scalar(evaluate_emotion)), calls),
+        "evaluate_emotion/batch": result(best_of(lambda: evaluate_emotion_batch(states, context)), batch, rows=batch),
+        "evaluate_policy/call": result(best_of(scalar(evaluate_policy)), calls),
+        "evaluate_policy/batch": result(best_of(lambda: evaluate_policy_batch(states, context)), batch, rows=batch),
+    }
+
+
+# ========== LOGGING ========== #
+def synthetic_entries(n, rng):
+    states = synthetic_states(n, rng)
+    emotions = rng.choice(EMOTIONS, n)
+    actions = rng.choice(ACTIONS, n)
+    rewards = rng.choice([-1.0, -0.5, 0.0, 1.0, 2.0], n)
+    return [
+        {
+            "frame": i,
+            "state": {name: float(values[i]) for name, values in states.items()},
+            "emotion": str(emotions[i]),
+            "action": str(actions[i]),
+            "reward": float(rewards[i]),
+        }
+        for i in range(n)
+    ]
+
+
+def bench_log_writers(rows=20_000):
+    from action_log import ActionLogWriter
+    from columnar_log import ColumnarLogWriter
+
+    entries = synthetic_entries(rows, np.random.default_rng(SEED))
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        for name, make in (("jsonl", lambda i: ActionLogWriter(os.path.join(tmp, f"{i}.jsonl"))),
+                           ("columnar", lambda i: ColumnarLogWriter(os.path.join(tmp, f"{i}.cols")))):
+            counter = iter(range(1000))
+
+            def write():
+                with make(next(counter)) as writer:
+                    for entry in entries:
+                        writer.write(entry)
+
+            results[f"log_write/{name}"] = result(best_of(write, repeat=3), rows, rows=rows)
+    return results
+
+
+# ========== TRAINING ========== #
+def synthetic_log(path, rows, rng, chunk_rows=1_000_000):
+    """A columnar log of `rows` random entries, written chunk by chunk."""
+    from columnar_log import ColumnarLogWriter
+
+    writer = ColumnarLogWriter(path)
+    for start in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - start)
+        states = synthetic_states(n, rng)
+        writer.write_columns(
+            frame=np.arange(start, start + n),
+            state=np.column_stack([states[name] for name in writer.meta["features"]]),
+            emotion=rng.choice(EMOTIONS, n),
+            action=rng.choice(ACTIONS, n),
+            reward=rng.choice([-1.0, -0.5, 0.0, 1.0, 2.0], n),
+        )
+    return path
+
+
+def bench_training(row_counts):
+    import pipeline
+    import plotting
+    import sweep  # noqa: F401  (scikit-learn)
+    from log_loader import load_dataset
+
+    plotting._plt()  # import costs are not a stage's time
+    results = {}
+    with scratch_dir():
+        rng = np.random.default_rng(SEED)
+        for rows in row_counts:
+            path = synthetic_log(f"synthetic_{rows}.cols", rows, rng)
+
+            # Small logs take well under a second per stage: keep the best of a few runs
+            repeat = 3 if rows <= 100_000 else 1
+            loaded = {}
+
+            def load():
+                loaded["X"], loaded["y"], loaded["rewards"] = load_dataset(path)
+
+            load_seconds = best_of(load, repeat)
+            dataset = {**loaded, "files": [path], "key": str(rows)}
+
+            def fit():
+                loaded["fitted"] = pipeline.fit(dataset, {"model_type": pipeline.MODEL_TYPE, "max_depth": pipeline.MAX_DEPTH})
+
+            fit_seconds = best_of(fit, repeat)
+            plot_seconds = best_of(lambda: pipeline.draw_plots(f"v{rows}", dataset, loaded["fitted"]["model"],
+                                                               workers=1, force=True), repeat)
+
+            for stage, seconds in (("load", load_seconds), ("fit", fit_seconds), ("plots", plot_seconds)):
+                results[f"train_{stage}/{rows}"] = result(seconds, rows=rows)
+    return results
+
+
+# ========== DASHBOARD ========== #
+def synthetic_registry(versions, rng):
+    from model_registry import PLOT_FILENAMES, save_index
+
+    entries = {}
+    for number in range(1, versions + 1):
+        version = f"v{number}"
+        config = {
+            "model_type": "DecisionTree",
+            "max_depth": 5,
+            "trained_on": 10000,
+            "features": ["hunger", "energy", "health", "stimulation", "fear_level"],
+            "timestamp": datetime(2025, 1, 1).isoformat(),
+            "f1_macro": float(rng.uniform(0.5, 1.0)),
+        }
+        entries[version] = {
+            "version": version,
+            "number": number,
+            "config": config,
+            "metrics": {"f1_macro": config["f1_macro"]},
+            "artifacts": {},
+            "plots": {name: f"plots/{version}/{name}" for name in PLOT_FILENAMES},
+            "thumbnails": {name: f"plots/{version}/thumbs/{name}" for name in PLOT_FILENAMES},
+        }
+    save_index({"versions": entries})
+
+
+def bench_dashboard(version_counts):
+    import pipeline
+
+    try:
+        import dashboard_server
+    except ImportError:
+        dashboard_server = None
+
+    results = {}
+    rng = np.random.default_rng(SEED)
+    for versions in version_counts:
+        with scratch_dir():
+            synthetic_registry(versions, rng)
+            os.makedirs("plots")
+            results[f"dashboard_generate/{versions}"] = result(
+                best_of(lambda: pipeline.generate_dashboard(force=True), number=20), 20, versions=versions)
+            if dashboard_server:
+                client = dashboard_server.app.test_client()
+                results[f"dashboard_api_page/{versions}"] = result(
+                    best_of(lambda: client.get("/api/versions?sort=f1_macro&per_page=25"), number=20), 20,
+                    versions=versions)
+    return results
+
+
+# ========== BASELINE ========== #
+def compare(results, baseline, threshold=THRESHOLD, min_seconds=MIN_SECONDS):
+    """
+    Benchmarks more than `threshold` slower than the baseline, as (name,
+    baseline s, current s). Results whose baseline is under `min_seconds`
+    are only flagged beyond NOISY_THRESHOLD (or `threshold`, if wider).
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        allowed = threshold if previous["seconds"] >= min_seconds else max(threshold, NOISY_THRESHOLD)
+        if current["seconds"] > previous["seconds"] * (1 + allowed):
+            regressions.append((name, previous["seconds"], current["seconds"]))
+    return regressions
+
+
+def machine_mismatches(meta, baseline_meta):
+    """(key, baseline value, current value) for each MACHINE_KEYS entry that differs."""
+    return [(key, baseline_meta.get(key), meta.get(key)) for key in MACHINE_KEYS
+            if baseline_meta.get(key) != meta.get(key)]
+
+
+SUITES = ["world", "engines", "logs", "train", "dashboard"]
+
+
+def run(suites, quick=True, train_rows=None):
+    results = {}
+    for suite in suites:
+        started = time.perf_counter()
+        if suite == "world":
+            results.update(bench_world(QUICK_WORLDS if quick else FULL_WORLDS))
+        elif suite == "engines":
+            results.update(bench_engines())
+        elif suite == "logs":
+            results.update(bench_log_writers())
+        elif suite == "train":
+            results.update(bench_training(train_rows or (QUICK_TRAIN_ROWS if quick else FULL_TRAIN_ROWS)))
+        elif suite == "dashboard":
+            results.update(bench_dashboard(QUICK_VERSIONS if quick else FULL_VERSIONS))
+        print(f"⏱️ {suite} suite took {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the simulation, engines, logging, training and dashboard.")
+    parser.add_argument("--suite", nargs="+", choices=SUITES, default=SUITES, help="suites to run (default: all)")
+    parser.add_argument("--full", action="store_true", help="larger worlds, logs of up to 10M rows and 10k versions")
+    parser.add_argument("--train-rows", type=int, nargs="+", default=None, help="synthetic log sizes for the train suite")
+    parser.add_argument("--output", default=None, help="write the results JSON here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help=f"compare against this results file (e.g. {BASELINE_FILE})")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown before failing, e.g. 0.25 = 25%%")
+    parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS,
+                        help=f"results faster than this per operation may slow down by {NOISY_THRESHOLD * 100:.0f}%% before failing")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write the results to {BASELINE_FILE}")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "mode": "full" if args.full else "quick",
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+        },
+    }
+    # Keep stdout for the JSON; progress messages from the stages go to stderr
+    with redirect_stdout(sys.stderr):
+        report["results"] = run(args.suite, quick=not args.full, train_rows=args.train_rows)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+        print(f"📄 Wrote {len(report['results'])} results to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(BASELINE_FILE, "w") as f:
+            f.write(text)
+        print(f"📌 Saved baseline to {BASELINE_FILE}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        for key, before, now in machine_mismatches(report["meta"], baseline.get("meta", {})):
+            print(f"⚠️ {args.baseline} was recorded with {key}={before!r}, this machine has {now!r}: "
+                  f"timings are not comparable, re-record it here with --save-baseline", file=sys.stderr)
+        regressions = compare(report["results"], baseline, args.threshold, args.min_seconds)
+        for name, before, after in regressions:
+            print(f"🐢 {name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms "
+                  f"(+{(after / before - 1) * 100:.0f}%)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.threshold:.0%} against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
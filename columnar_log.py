@@ -0,0 +1,200 @@
+# columnar_log.py
+
+import os
+import sys
+import json
+import time
+import numpy as np
+from action_log import read_log
+
+COLUMNAR_FILE = "agent_log.cols"
+FEATURE_NAMES = ["hunger", "energy", "health", "stimulation", "fear_level"]
+
+# column -> dtype of its .npy file. State is float32 because that is what
+# the decision tree trains and predicts on anyway.
+COLUMNS = {
+    "frame": np.int32,
+    "state": np.float32,
+    "emotion": np.uint8,
+    "action": np.uint8,
+    "reward": np.float32,
+    "agent": np.int32,
+}
+
+
+class ColumnarLogWriter:
+    """
+    Write agent log entries as a directory of typed columns.
+
+    Rows are gathered into chunks of `chunk_rows`; each chunk is saved as one
+    .npy file per column (`00000.state.npy`, ...), so it can be memory-mapped
+    straight back into a feature matrix. Emotion and action strings are
+    dictionary-encoded as uint8 codes, with the dictionaries kept in
+    meta.json. Opening an existing log appends to it.
+    """
+
+    def __init__(self, path=COLUMNAR_FILE, chunk_rows=65536):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        os.makedirs(path, exist_ok=True)
+        self.meta = read_meta(path) if os.path.exists(os.path.join(path, "meta.json")) else {
+            "format": 1,
+            "features": FEATURE_NAMES,
+            "emotions": [],
+            "actions": [],
+            "chunks": [],
+        }
+        self._codes = {
+            "emotion": {label: i for i, label in enumerate(self.meta["emotions"])},
+            "action": {label: i for i, label in enumerate(self.meta["actions"])},
+        }
+        self.rows_written = sum(chunk["rows"] for chunk in self.meta["chunks"])
+        self._rows = []
+
+    def _encode(self, column, label):
+        codes = self._codes[column]
+        code = codes.get(label)
+        if code is None:
+            code = codes[label] = len(codes)
+            self.meta[column + "s"].append(label)
+        return code
+
+    def write(self, entry):
+        self._rows.append(entry)
+        if len(self._rows) >= self.chunk_rows:
+            self.flush()
+
+    def write_rows(self, entries):
+        for entry in entries:
+            self.write(entry)
+
+    def flush(self):
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        features = self.meta["features"]
+        columns = {
+            "frame": [entry["frame"] for entry in rows],
+            "state": [[entry["state"][name] for name in features] for entry in rows],
+            "emotion": [self._encode("emotion", entry["emotion"]) for entry in rows],
+            "action": [self._encode("action", entry["action"]) for entry in rows],
+            "reward": [entry["reward"] for entry in rows],
+        }
+        if any("agent" in entry for entry in rows):
+            columns["agent"] = [entry.get("agent", -1) for entry in rows]
+        self._write_chunk(columns)
+
+    def write_columns(self, frame, state, emotion, action, reward, agent=None):
+        """
+        Append whole arrays as one chunk, skipping per-entry dicts: `state`
+        is (rows, features) in meta["features"] order, `emotion` and
+        `action` are label arrays.
+        """
+        self.flush()
+        columns = {"frame": frame, "state": state, "reward": reward}
+        for column, labels in (("emotion", emotion), ("action", action)):
+            uniques, inverse = np.unique(np.asarray(labels), return_inverse=True)
+            codes = np.array([self._encode(column, str(label)) for label in uniques], dtype=COLUMNS[column])
+            columns[column] = codes[inverse]
+        if agent is not None:
+            columns["agent"] = agent
+        self._write_chunk(columns)
+
+    def _write_chunk(self, columns):
+        name = f"{len(self.meta['chunks']):05d}"
+        rows = 0
+        for column, values in columns.items():
+            values = np.asarray(values, dtype=COLUMNS[column])
+            np.save(os.path.join(self.path, f"{name}.{column}.npy"), values)
+            rows = len(values)
+        self.meta["chunks"].append({"name": name, "rows": rows, "columns": sorted(columns)})
+        self.rows_written += rows
+        self._write_meta()
+
+    def _write_meta(self):
+        tmp_path = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.path, "meta.json"))
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_meta(path):
+    with open(os.path.join(path, "meta.json"), "r") as f:
+        return json.load(f)
+
+
+def iter_chunks(path, mmap=True):
+    """Yield each chunk of a columnar log as a dict of (memory-mapped) arrays."""
+    meta = read_meta(path)
+    for chunk in meta["chunks"]:
+        yield {
+            column: np.load(os.path.join(path, f"{chunk['name']}.{column}.npy"), mmap_mode="r" if mmap else None)
+            for column in chunk["columns"]
+        }
+
+
+def load_columnar(path, mmap=True):
+    """
+    Load a whole columnar log as arrays, plus `emotion_labels` and
+    `action_labels` decoded from the dictionaries. A single-chunk log stays
+    memory-mapped; more chunks are concatenated.
+    """
+    meta = read_meta(path)
+    chunks = list(iter_chunks(path, mmap=mmap))
+    if not chunks:
+        columns = {column: np.empty((0, len(meta["features"])) if column == "state" else 0, dtype)
+                   for column, dtype in COLUMNS.items() if column != "agent"}
+    elif len(chunks) == 1:
+        columns = dict(chunks[0])
+    else:
+        names = set.intersection(*(set(chunk) for chunk in chunks))
+        columns = {column: np.concatenate([chunk[column] for chunk in chunks]) for column in names}
+
+    columns["emotion_labels"] = np.asarray(meta["emotions"] or [""])[columns["emotion"]]
+    columns["action_labels"] = np.asarray(meta["actions"] or [""])[columns["action"]]
+    columns["features"] = meta["features"]
+    return columns
+
+
+def convert(source, dest=COLUMNAR_FILE, chunk_rows=65536):
+    """Convert a JSON / JSON Lines agent log into a fresh columnar log."""
+    if os.path.exists(os.path.join(dest, "meta.json")):
+        raise FileExistsError(f"{dest} already exists")
+    with ColumnarLogWriter(dest, chunk_rows=chunk_rows) as writer:
+        writer.write_rows(read_log(source))
+    return dest
+
+
+def disk_size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print(f"Usage: python columnar_log.py agent_log.json [{COLUMNAR_FILE}]")
+        sys.exit(1)
+    source = sys.argv[1]
+    dest = sys.argv[2] if len(sys.argv) == 3 else COLUMNAR_FILE
+    convert(source, dest)
+
+    started = time.perf_counter()
+    read_log(source)
+    json_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    cols = load_columnar(dest)
+    np.asarray(cols["state"]).sum()
+    columnar_seconds = time.perf_counter() - started
+
+    print(f"🗜️ {source}: {disk_size(source) / 1024:.0f} KB, loads in {json_seconds * 1000:.1f} ms")
+    print(f"🗜️ {dest}: {disk_size(dest) / 1024:.0f} KB, loads in {columnar_seconds * 1000:.1f} ms")
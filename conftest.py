@@ -0,0 +1,12 @@
+import pytest
+import policy_engine
+from policy_engine import PolicyRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch, tmp_path):
+    """An empty policy registry, so evaluate_policy starts on the fallback rules."""
+    fresh = PolicyRegistry(str(tmp_path))
+    fresh.set_active(None)
+    monkeypatch.setattr(policy_engine, "registry", fresh)
+    return fresh
@@ -1,23 +1,257 @@
-from flask import Flask, send_from_directory
+import os
+import json
+import gzip
+import time
+import argparse
+import mimetypes
+from io import BytesIO
+from flask import Flask, Response, abort, jsonify, request, send_file
+from werkzeug.security import safe_join
+from model_registry import MODELS_DIR, PLOTS_DIR, file_checksum, load_index
+from telemetry import TelemetryBuffer, TelemetryReceiver
 
 app = Flask(__name__)
 
+# A URL carrying its file's content hash (?h=, see _plot_url) names exactly
+# one version of the file, so it may be cached for good. Plain URLs are
+# revalidated: plots can be redrawn (--backfill-plots --force) and
+# policy_tree.json added after a version is first written.
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Rewritten in place after training (rollout.py), so never cached for good
+MUTABLE_FILES = {"config.json", "rollout.json"}
+GZIP_TYPES = {"text/html", "application/json", "text/css", "application/javascript"}
+GZIP_MIN_BYTES = 512
+
+# Live aggregates from a running simulation (main.py, or world.py --telemetry)
+telemetry = TelemetryBuffer()
+
+# path -> (mtime_ns, size, sha256), so each file is hashed once per change
+_checksums = {}
+# sha256 -> gzipped body of a text file
+_gzipped = {}
+
+def content_hash(path):
+    stat = os.stat(path)
+    cached = _checksums.get(path)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    checksum = file_checksum(path)
+    _checksums[path] = (stat.st_mtime_ns, stat.st_size, checksum)
+    return checksum
+
+def send_cached(directory, filename, hash_addressed=False):
+    """
+    Send a file with a strong ETag from its content hash and its
+    Last-Modified time; conditional requests get 304 Not Modified.
+    With `hash_addressed`, a request whose ?h= matches the file's content
+    hash may be cached for a year; everything else is revalidated.
+    """
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    checksum = content_hash(path)
+    requested = request.args.get("h")
+    immutable = (hash_addressed and filename not in MUTABLE_FILES
+                 and bool(requested) and checksum.startswith(requested))
+    mimetype = mimetypes.guess_type(path)[0]
+    if mimetype in GZIP_TYPES and _accepts_gzip():
+        if checksum not in _gzipped:
+            if len(_gzipped) > 64:
+                _gzipped.clear()
+            with open(path, "rb") as f:
+                _gzipped[checksum] = gzip.compress(f.read(), compresslevel=6)
+        response = send_file(BytesIO(_gzipped[checksum]), mimetype=mimetype, etag=f"{checksum}-gzip",
+                             last_modified=os.path.getmtime(path), conditional=True)
+        response.headers["Content-Encoding"] = "gzip"
+        response.vary.add("Accept-Encoding")
+    else:
+        response = send_file(os.path.abspath(path), etag=checksum, last_modified=os.path.getmtime(path), conditional=True)
+    if immutable:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+def _accepts_gzip():
+    return "gzip" in request.headers.get("Accept-Encoding", "")
+
+@app.after_request
+def compress(response):
+    """gzip generated text responses (the JSON API) for clients that accept it."""
+    if (response.mimetype not in GZIP_TYPES or response.status_code != 200 or response.is_streamed
+            or response.direct_passthrough or "Content-Encoding" in response.headers or not _accepts_gzip()):
+        return response
+    data = response.get_data()
+    if len(data) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    etag, weak = response.get_etag()
+    if etag:
+        # A different body needs a different strong ETag
+        response.set_etag(f"{etag}-gzip", weak=weak)
+    return response
+
 @app.route("/")
 def root():
-    return send_from_directory(".", "dashboard.html")
+    return send_cached(".", "dashboard.html")
 
 @app.route("/plots/<version>/<filename>")
 def plots(version, filename):
-    return send_from_directory(f"plots/{version}", filename)
+    return send_cached(safe_join(PLOTS_DIR, version) or abort(404), filename, hash_addressed=True)
 
 @app.route("/models/<version>/<filename>")
 def models(version, filename):
-    return send_from_directory(f"models/{version}", filename)
+    return send_cached(safe_join(MODELS_DIR, version) or abort(404), filename, hash_addressed=True)
+
+@app.route("/plots/<version>/thumbs/<filename>")
+def thumbnails(version, filename):
+    return send_cached(safe_join(PLOTS_DIR, version, "thumbs") or abort(404), filename, hash_addressed=True)
 
 @app.route("/plots/<filename>")
 def root_plots(filename):
-    return send_from_directory("plots", filename)
+    return send_cached(PLOTS_DIR, filename)
+
+def _plot_url(path):
+    # The content hash in the URL lets browsers keep the image for good
+    if not os.path.isfile(path):
+        return None
+    return f"/{path}?h={content_hash(path)[:12]}"
+
+def version_summary(entry):
+    cfg = entry["config"]
+    return {
+        "version": entry["version"],
+        "number": entry["number"],
+        "f1_macro": cfg.get("f1_macro"),
+        "timestamp": cfg.get("timestamp"),
+        "model_type": cfg.get("model_type"),
+        "max_depth": cfg.get("max_depth"),
+        "trained_on": cfg.get("trained_on"),
+        "features": cfg.get("features", []),
+        "survival_frames": entry["metrics"].get("survival_frames"),
+        # The whole rollout.py summary (None until the version is rolled out)
+        "rollout": entry.get("rollout"),
+        "artifacts": {name: f"/{artifact['path']}" for name, artifact in entry.get("artifacts", {}).items()},
+        "plots": {name.rsplit(".", 1)[0]: _plot_url(path) for name, path in entry["plots"].items()},
+        "thumbnails": {
+            name.rsplit(".", 1)[0]: _plot_url(entry.get("thumbnails", {}).get(name, "")) or _plot_url(path)
+            for name, path in entry["plots"].items()
+        },
+    }
+
+# ?sort= value -> key of an index entry
+SORT_KEYS = {
+    "version": lambda entry: entry["number"],
+    "f1_macro": lambda entry: entry["config"].get("f1_macro") or 0.0,
+    "timestamp": lambda entry: entry["config"].get("timestamp") or "",
+    "survival": lambda entry: entry["metrics"].get("survival_frames") or 0.0,
+}
+MAX_PER_PAGE = 100
+
+@app.route("/api/versions")
+def versions():
+    """
+    One page of registered versions from models/index.json, sorted by
+    `sort` (version, f1_macro, timestamp or survival) in `order` (asc or desc).
+    Only the rows of the requested page are summarised.
+    """
+    sort = request.args.get("sort", "version")
+    if sort not in SORT_KEYS:
+        abort(400, f"sort must be one of {', '.join(SORT_KEYS)}")
+    descending = request.args.get("order", "desc") != "asc"
+    per_page = min(max(request.args.get("per_page", 25, type=int), 1), MAX_PER_PAGE)
+    entries = sorted(load_index(MODELS_DIR)["versions"].values(), key=SORT_KEYS[sort], reverse=descending)
+    pages = max(1, -(-len(entries) // per_page))
+    page = min(max(request.args.get("page", 1, type=int), 1), pages)
+
+    response = jsonify({
+        "versions": [version_summary(entry) for entry in entries[(page - 1) * per_page:page * per_page]],
+        "total": len(entries),
+        "page": page,
+        "pages": pages,
+        "per_page": per_page,
+        "sort": sort,
+        "order": "desc" if descending else "asc",
+    })
+    response.cache_control.no_cache = True
+    return _conditional(response)
+
+def _conditional(response):
+    """Strong ETag from the body; 304 if the client has it, gzipped or not."""
+    response.add_etag()
+    etag, _ = response.get_etag()
+    if request.if_none_match.contains(etag) or request.if_none_match.contains(f"{etag}-gzip"):
+        not_modified = Response(status=304)
+        not_modified.set_etag(etag)
+        not_modified.cache_control.no_cache = True
+        return not_modified
+    return response
+
+def _since():
+    # EventSource resends the last id on reconnect. A sequence ahead of the
+    # buffer means the server restarted, so start over.
+    since = request.args.get("since", type=int) or request.headers.get("Last-Event-ID", 0, type=int)
+    return since if since <= telemetry.seq else 0
+
+@app.route("/api/telemetry")
+def telemetry_poll():
+    """
+    Long-poll: samples newer than `since`, waiting up to `timeout` seconds
+    for some to arrive, downsampled to at most `max_points`.
+    """
+    since = _since()
+    timeout = min(request.args.get("timeout", 10, type=float), 30)
+    max_points = request.args.get("max_points", 200, type=int)
+    telemetry.wait(since, timeout)
+    seq, samples = telemetry.since(since, max_points)
+    response = jsonify({"seq": seq, "samples": samples})
+    response.cache_control.no_store = True
+    return response
+
+@app.route("/api/telemetry/stream")
+def telemetry_stream():
+    """
+    Server-Sent Events: at most `hz` events per second, each holding the
+    samples since the previous event downsampled to `max_points`, so a
+    browser keeps up however fast the simulation steps.
+    """
+    since = _since()
+    interval = 1.0 / max(request.args.get("hz", 10, type=float), 0.1)
+    max_points = request.args.get("max_points", 50, type=int)
+
+    def events():
+        seq = since
+        while True:
+            started = time.monotonic()
+            if telemetry.wait(seq, timeout=15):
+                seq, samples = telemetry.since(seq, max_points)
+                yield f"id: {seq}\ndata: {json.dumps(samples)}\n\n"
+            else:
+                yield ": keepalive\n\n"
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    return Response(events(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+def start_telemetry():
+    try:
+        TelemetryReceiver(telemetry).start()
+    except OSError as e:
+        print(f"⚠️ Live telemetry disabled: {e}")
 
 if __name__ == "__main__":
-    print("🌐 Dashboard running at: http://localhost:5000")
-    app.run(debug=True)
+    parser = argparse.ArgumentParser(description="Serve the training dashboard and live telemetry.")
+    parser.add_argument("--debug", action="store_true", help="Flask debug mode with the auto-reloader")
+    parser.add_argument("--host", default="0.0.0.0" if "PORT" in os.environ else "127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 5000)))
+    args = parser.parse_args()
+
+    # In debug mode the reloader re-runs this file; only its child serves
+    if not args.debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_telemetry()
+    print(f"🌐 Dashboard running at: http://localhost:{args.port}")
+    app.run(host=args.host, port=args.port, debug=args.debug, threaded=True)
@@ -1,5 +1,8 @@
 # emotion_engine.py
 
+import numpy as np
+
+
 def evaluate_emotion(state, context):
     """
     Determines the agent's current emotional state based on internal state and context.
@@ -39,3 +42,35 @@ def evaluate_emotion(state, context):
         return "Curious"
 
     return "Idle"
+
+
+def evaluate_emotion_batch(state, context):
+    """
+    Vectorised evaluate_emotion for a whole population.
+
+    Args:
+        state (dict): same keys as evaluate_emotion, each an array with one
+            entry per agent
+        context (dict): {
+            "novelty_trigger": bool array (or scalar)
+        }
+
+    Returns:
+        numpy.ndarray: Emotion label per agent
+    """
+    hunger = np.asarray(state["hunger"])
+    novelty = np.broadcast_to(context.get("novelty_trigger", False), hunger.shape)
+
+    # np.select picks the first matching condition, mirroring the if-chain above
+    return np.select(
+        [
+            np.asarray(state["health"]) <= 0,
+            np.asarray(state["fear_level"]) > 60,
+            hunger > 70,
+            np.asarray(state["energy"]) < 20,
+            np.asarray(state["stimulation"]) < 20,
+            novelty,
+        ],
+        ["Dead", "Fearful", "Hungry", "Exhausted", "Bored", "Curious"],
+        default="Idle",
+    )
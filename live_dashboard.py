@@ -2,10 +2,12 @@ from livereload import Server
 
 server = Server()
 
-# Watch the dashboard HTML and image folders
-server.watch('index.html')
-server.watch('plots/')
-server.watch('models/')
+# Watch only what changes when a model is trained: the generated page, the
+# learning curve and the registry index. Versioned plots and models are
+# immutable, so watching their whole trees only costs rescans.
+server.watch('dashboard.html')
+server.watch('plots/learning_curve.png')
+server.watch('models/index.json')
 
 # Serve from current directory on port 5000
-server.serve(root='.', port=5000, open_url_delay=1)
+server.serve(root='.', port=5000, open_url_delay=1, default_filename='dashboard.html')
@@ -0,0 +1,158 @@
+# log_loader.py
+
+import os
+import glob
+import re
+import json
+import numpy as np
+from action_log import is_session_header
+from columnar_log import iter_chunks as iter_columnar_chunks, read_meta
+
+FEATURE_NAMES = ["hunger", "energy", "health", "stimulation", "fear_level"]
+CHUNK_ROWS = 65536
+
+# Whitespace and commas between elements of a JSON list
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def expand_paths(paths):
+    """Expand globs and keep only existing logs, in a stable order."""
+    if isinstance(paths, str):
+        paths = [paths]
+    found = []
+    for pattern in paths:
+        matches = sorted(glob.glob(pattern)) or ([pattern] if os.path.exists(pattern) else [])
+        found.extend(m for m in matches if m not in found)
+    if not found:
+        raise FileNotFoundError(f"No agent logs found for {paths}")
+    return found
+
+
+def iter_entries(path, block_size=1 << 20):
+    """
+    Yield log entries one at a time from a JSON Lines file or a JSON list,
+    without reading the whole file into memory.
+    """
+    with open(path, "r") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    if not is_session_header(entry):
+                        yield entry
+            return
+
+        # A JSON list: decode one element at a time from a rolling buffer
+        decoder = json.JSONDecoder()
+        buffer = f.read(block_size)
+        pos = _SEPARATORS.match(buffer).end()
+        if buffer[pos:pos + 1] != "[":
+            raise ValueError(f"{path} is not a JSON list of log entries")
+        pos += 1
+        while True:
+            pos = _SEPARATORS.match(buffer, pos).end()
+            if len(buffer) - pos < block_size // 2:
+                more = f.read(block_size)
+                if more:
+                    buffer, pos = buffer[pos:] + more, 0
+                    continue
+            if pos >= len(buffer):
+                raise ValueError(f"{path} ends before the closing ']'")
+            if buffer[pos] == "]":
+                return
+            try:
+                entry, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                more = f.read(block_size)
+                if not more:
+                    raise
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            yield entry
+
+
+def _in_range(frames, frame_range):
+    start, stop = frame_range or (None, None)
+    keep = np.ones(len(frames), dtype=bool)
+    if start is not None:
+        keep &= frames >= start
+    if stop is not None:
+        keep &= frames < stop
+    return keep
+
+
+def _columnar_chunks(path, chunk_size, frame_range):
+    meta = read_meta(path)
+    order = [meta["features"].index(name) for name in FEATURE_NAMES]
+    actions = np.asarray(meta["actions"] or [""])
+    for chunk in iter_columnar_chunks(path):
+        keep = _in_range(chunk["frame"], frame_range)
+        rows = np.flatnonzero(keep)
+        for start in range(0, len(rows), chunk_size):
+            sel = rows[start:start + chunk_size]
+            yield (
+                np.asarray(chunk["state"][sel][:, order], dtype=np.float32),
+                actions[chunk["action"][sel]],
+                np.asarray(chunk["reward"][sel], dtype=np.float32),
+            )
+
+
+def _entry_chunks(path, chunk_size, frame_range):
+    X = np.empty((chunk_size, len(FEATURE_NAMES)), dtype=np.float32)
+    rewards = np.empty(chunk_size, dtype=np.float32)
+    y = []
+    start, stop = frame_range or (None, None)
+
+    for entry in iter_entries(path):
+        frame = entry.get("frame")
+        if (start is not None and frame < start) or (stop is not None and frame >= stop):
+            continue
+        state = entry["state"]
+        n = len(y)
+        X[n] = [state[name] for name in FEATURE_NAMES]
+        rewards[n] = entry["reward"]
+        y.append(entry["action"])
+        if len(y) == chunk_size:
+            yield X.copy(), np.asarray(y), rewards.copy()
+            y = []
+    if y:
+        yield X[:len(y)].copy(), np.asarray(y), rewards[:len(y)].copy()
+
+
+def iter_chunks(paths, chunk_size=CHUNK_ROWS, frame_range=None):
+    """
+    Stream (X, y, rewards) NumPy chunks of at most `chunk_size` rows from
+    one or many logs (JSON, JSON Lines or columnar directories).
+
+    `frame_range` is an optional (start, stop) pair; only entries with
+    start <= frame < stop are kept, and either end may be None.
+    """
+    for path in expand_paths(paths):
+        if os.path.isdir(path):
+            yield from _columnar_chunks(path, chunk_size, frame_range)
+        else:
+            yield from _entry_chunks(path, chunk_size, frame_range)
+
+
+def load_dataset(paths, chunk_size=CHUNK_ROWS, frame_range=None):
+    """
+    Load (X, y, rewards) arrays from `paths` chunk by chunk. Only one chunk
+    of parsed entries exists at a time, so peak memory is about twice the
+    size of the compact arrays, never the size of the parsed log.
+    """
+    X_parts, y_parts, reward_parts = [], [], []
+    for X, y, rewards in iter_chunks(paths, chunk_size, frame_range):
+        X_parts.append(X)
+        y_parts.append(y)
+        reward_parts.append(rewards)
+    if not X_parts:
+        return np.empty((0, len(FEATURE_NAMES)), dtype=np.float32), np.empty(0, dtype=str), np.empty(0, dtype=np.float32)
+    return np.concatenate(X_parts), np.concatenate(y_parts), np.concatenate(reward_parts)
+
+
+def parse_frame_range(text):
+    """Parse "START:STOP" (either side optional) into a frame_range tuple."""
+    if not text:
+        return None
+    start, _, stop = text.partition(":")
+    return (int(start) if start else None, int(stop) if stop else None)
@@ -1,10 +1,14 @@
 import pygame
 import sys
-import random
+import argparse
 from settings import *
-from agent import Agent
-from prey import Prey
-from predator import Predator
+from world import World
+from model_watcher import ModelWatcher
+from action_log import ActionLogWriter, LOG_FILE
+from telemetry import TelemetryPublisher
+from profiler import FrameProfiler
+from render import CachedFont, draw_circles, draw_target_lines, translucent_panel
+from replay import ReplayRecorder, ReplayReader
 
 pygame.init()
 
@@ -12,8 +16,10 @@ pygame.init()
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("AI Emotions Simulator")
 clock = pygame.time.Clock()
-font = pygame.font.SysFont(None, 30)
-large_font = pygame.font.SysFont(None, 48)
+# Text is rendered once per distinct (text, colour) and reused after that
+font = CachedFont(pygame.font.SysFont(None, 30))
+large_font = CachedFont(pygame.font.SysFont(None, 48))
+small_font = CachedFont(pygame.font.SysFont("monospace", 14))
 
 message_log = ""
 message_timer = 0
@@ -31,9 +37,7 @@ def draw_emotion_panel(screen, emotion, colour):
     panel_width, panel_height = 300, 60
     panel_x = (SCREEN_WIDTH - panel_width) // 2
     panel_y = 20
-    panel_surface = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
-    panel_surface.fill((0, 0, 0, 160))  # translucent black
-    screen.blit(panel_surface, (panel_x, panel_y))
+    screen.blit(translucent_panel(panel_width, panel_height), (panel_x, panel_y))
 
     text_surface = large_font.render(emotion, True, colour)
     text_rect = text_surface.get_rect(center=(SCREEN_WIDTH // 2, panel_y + panel_height // 2))
@@ -47,83 +51,201 @@ def draw_message_log(screen, message):
         screen.blit(text_surface, text_rect)
 
 
+# Emotion panel, progress bars and thought bubble for the followed agent
+def draw_agent_hud(screen, agent):
+    emotion_colour = EMOTION_COLOURS.get(agent.emotion, (255, 255, 255))
+    draw_emotion_panel(screen, agent.emotion, emotion_colour)
+
+    # Progress bars (top-left)
+    bar_x = 20
+    bar_y_start = 100
+    bar_width = 200
+    bar_height = 20
+    bar_spacing = 40
+
+    draw_progress_bar(screen, bar_x, bar_y_start + 0 * bar_spacing, bar_width, bar_height, agent.health, 100, "Health", (0, 255, 0))
+    draw_progress_bar(screen, bar_x, bar_y_start + 1 * bar_spacing, bar_width, bar_height, agent.hunger, 100, "Hunger", (255, 165, 0))
+    draw_progress_bar(screen, bar_x, bar_y_start + 2 * bar_spacing, bar_width, bar_height, agent.energy, 100, "Energy", (0, 150, 255))
+    draw_progress_bar(screen, bar_x, bar_y_start + 3 * bar_spacing, bar_width, bar_height, agent.stimulation, 100, "Stimulation", (255, 255, 0))
+
+    # Thought bubble for active emotions
+    if agent.emotion in ["Curious", "Fearful"]:
+        pygame.draw.circle(screen, (255, 255, 255), (int(agent.x), int(agent.y - 30)), 5)
+        pygame.draw.circle(screen, (255, 255, 255), (int(agent.x), int(agent.y - 40)), 3)
+
+
+# Replay timeline (bottom): progress, frame and speed; click it to seek
+TIMELINE_HEIGHT = 8
+
+def draw_timeline(screen, index, total, frame, speed, paused):
+    y = SCREEN_HEIGHT - TIMELINE_HEIGHT
+    pygame.draw.rect(screen, (50, 50, 50), (0, y, SCREEN_WIDTH, TIMELINE_HEIGHT))
+    pygame.draw.rect(screen, (200, 200, 200), (0, y, int(SCREEN_WIDTH * (index + 1) / max(total, 1)), TIMELINE_HEIGHT))
+    status = "paused" if paused else f"x{speed:g}"
+    label = small_font.render(f"frame {frame}  ({index + 1}/{total})  {status}", True, (200, 200, 200))
+    screen.blit(label, (10, y - 20))
+
+
+# Debug overlay: per-stage frame times from the profiler (top-right)
+def draw_profiler_overlay(screen, stats):
+    x, y = SCREEN_WIDTH - 330, 20
+    screen.blit(translucent_panel(310, 24 + 20 * len(stats)), (x - 10, y - 6))
+    screen.blit(small_font.render(f"{'stage':<16}{'p50':>7}{'p95':>7}{'p99':>7}", True, (255, 255, 255)), (x, y))
+    for i, (stage, s) in enumerate(stats.items(), 1):
+        line = f"{stage:<16}{s['p50']:>7.2f}{s['p95']:>7.2f}{s['p99']:>7.2f}"
+        screen.blit(small_font.render(line, True, (200, 200, 200)), (x, y + 20 * i))
+
+
+def replay(path, speed=1.0):
+    """
+    Play a recording from world.py --record or main.py --record.
+    Space pauses, Left/Right step a second (a frame while paused), Up/Down
+    double or halve the speed, R reverses, Home/End and 0-9 jump, and
+    clicking the timeline seeks there.
+    """
+    reader = ReplayReader(path)
+    total = len(reader)
+    if not total:
+        print(f"⚠️ '{path}' has no frames")
+        return
+    pygame.display.set_caption(f"AI Emotions Simulator - replay of {path}")
+    position, paused = 0.0, False
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.KEYDOWN:
+                step = 1 if paused else FPS
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_RIGHT:
+                    position += step
+                elif event.key == pygame.K_LEFT:
+                    position -= step
+                elif event.key == pygame.K_UP:
+                    speed = min(speed * 2, 64) if speed > 0 else max(speed * 2, -64)
+                elif event.key == pygame.K_DOWN:
+                    speed = speed / 2 if abs(speed) > 1 / 8 else speed
+                elif event.key == pygame.K_r:
+                    speed = -speed
+                elif event.key == pygame.K_HOME:
+                    position = 0
+                elif event.key == pygame.K_END:
+                    position = total - 1
+                elif pygame.K_0 <= event.key <= pygame.K_9:
+                    position = total * (event.key - pygame.K_0) / 10
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.pos[1] >= SCREEN_HEIGHT - 3 * TIMELINE_HEIGHT:
+                position = total * event.pos[0] / SCREEN_WIDTH
+
+        if not paused:
+            position += speed
+        position = min(max(position, 0), total - 1)
+        frame = reader[int(position)]
+
+        screen.fill(BG_COLOUR)
+        draw_circles(screen, frame.prey, PREY_COLOUR)
+        draw_circles(screen, frame.predators, PREDATOR_COLOUR)
+        for start, end in frame.target_lines():
+            pygame.draw.line(screen, (255, 100, 100), start, end, 1)
+        frame.agent.draw(screen, font)
+        draw_agent_hud(screen, frame.agent)
+        draw_timeline(screen, int(position), total, frame.frame, speed, paused)
+
+        pygame.display.flip()
+        clock.tick(FPS)
+
+
 def main():
     global message_log, message_timer
+    parser = argparse.ArgumentParser(description="Run the simulation with graphics, or play back a recording.")
+    parser.add_argument("--replay", default=None, help="play this replay file instead of simulating")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed in recorded frames per displayed frame")
+    parser.add_argument("--record", default=None, help="record the session to this replay file")
+    args = parser.parse_args()
+    if args.replay:
+        return replay(args.replay, args.speed)
+
     debug_mode = True
-    agent = Agent()
-    prey_list = [Prey() for _ in range(20)]
-    predator_list = [Predator() for _ in range(3)]
+    world = World()
+    # Only attached while debug mode is on (toggle with D); detached, the frame costs nothing extra
+    profiler = FrameProfiler().attach(world)
+    profiler_stats = {}
+    agent = world.agent
+    world.agents.log_writer = ActionLogWriter(LOG_FILE, max_bytes=int(LOG_ROTATE_MB * 1024 * 1024))
+    world.telemetry = TelemetryPublisher()  # shown live by dashboard_server.py
+    if args.record:
+        world.recorder = ReplayRecorder(args.record, meta={"seed": world.seed})
+
+    # Pick up models written by train_agent.py while the game is running
+    def on_new_model(model_path):
+        global message_log, message_timer
+        message_log = f"New policy loaded: {model_path}"
+        message_timer = 180
+    ModelWatcher(on_swap=on_new_model).start()
 
     while True:
+        profiling = world.profiler is not None
+        if profiling:
+            profiler.begin_frame()
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                world.agents.log_writer.close()
+                world.telemetry.close()
+                if world.recorder:
+                    world.recorder.close()
                 pygame.quit()
                 sys.exit()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_s:
-                    agent.save_action_log("agent_log.json")
+                    agent.save_action_log()
                 elif event.key == pygame.K_d:
                     debug_mode = not debug_mode
-
-        screen.fill(BG_COLOUR)
-
-        # Update and draw prey
-        for prey in prey_list[:]:
-            prey.update(prey_list)
-            prey.draw(screen)
-
-        # Update and draw predators
-        for predator in predator_list:
-            predator.update(prey_list, predator_list)
-            predator.draw(screen)
-
-        # Predator eats prey on contact
-        for predator in predator_list:
-            for prey in prey_list[:]:
-                if pygame.Vector2(predator.x, predator.y).distance_to(prey.get_position()) < predator.radius + prey.radius:
-                    prey_list.remove(prey)
+                    if debug_mode:
+                        profiler.attach(world)
+                    else:
+                        profiler.detach(world)
+        if profiling:
+            profiler.lap("events")
 
         # Track emotion change for message log
         prev_emotion = agent.emotion
-        agent.update(prey_list, predator_list)
+        world.step()
         if agent.emotion != prev_emotion:
             message_log = f"The agent feels {agent.emotion.lower()}..."
             message_timer = 180  # 3 seconds
 
-        # Occasionally spawn new prey
-        if random.random() < 0.01 and len(prey_list) < 50:
-            prey_list.append(Prey())
-
-        agent.draw(screen, font)
-
-        # Draw emotion panel
-        emotion_colour = EMOTION_COLOURS.get(agent.emotion, (255, 255, 255))
-        draw_emotion_panel(screen, agent.emotion, emotion_colour)
-
-        # Progress bars (top-left)
-        bar_x = 20
-        bar_y_start = 100
-        bar_width = 200
-        bar_height = 20
-        bar_spacing = 40
+        screen.fill(BG_COLOUR)
 
-        draw_progress_bar(screen, bar_x, bar_y_start + 0 * bar_spacing, bar_width, bar_height, agent.health, 100, "Health", (0, 255, 0))
-        draw_progress_bar(screen, bar_x, bar_y_start + 1 * bar_spacing, bar_width, bar_height, agent.hunger, 100, "Hunger", (255, 165, 0))
-        draw_progress_bar(screen, bar_x, bar_y_start + 2 * bar_spacing, bar_width, bar_height, agent.energy, 100, "Energy", (0, 150, 255))
-        draw_progress_bar(screen, bar_x, bar_y_start + 3 * bar_spacing, bar_width, bar_height, agent.stimulation, 100, "Stimulation", (255, 255, 0))
+        # One blits call per population rather than a draw call per entity
+        draw_circles(screen, world.prey, PREY_COLOUR)
+        draw_circles(screen, world.predators, PREDATOR_COLOUR)
+        draw_target_lines(screen, world.predators)
 
-        # Thought bubble for active emotions
-        if agent.emotion in ["Curious", "Fearful"]:
-            pygame.draw.circle(screen, (255, 255, 255), (int(agent.x), int(agent.y - 30)), 5)
-            pygame.draw.circle(screen, (255, 255, 255), (int(agent.x), int(agent.y - 40)), 3)
+        agent.draw(screen, font)
+        draw_agent_hud(screen, agent)
 
         # Show message log
         if message_timer > 0:
             draw_message_log(screen, message_log)
             message_timer -= 1
 
+        if profiling:
+            # Percentiles change slowly; recomputing twice a second keeps the overlay cheap
+            if profiler.frames % 30 == 0:
+                profiler_stats = profiler.percentiles()
+            draw_profiler_overlay(screen, profiler_stats)
+            profiler.lap("draw")
+
         pygame.display.flip()
+        if profiling:
+            profiler.lap("flip")
         clock.tick(FPS)
+        if profiling:
+            profiler.lap("wait")
+            profiler.end_frame()
 
 if __name__ == "__main__":
     main()
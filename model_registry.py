@@ -0,0 +1,174 @@
+# model_registry.py
+
+import os
+import json
+import hashlib
+import tempfile
+
+MODELS_DIR = "models"
+PLOTS_DIR = "plots"
+INDEX_FILENAME = "index.json"
+MODEL_FILENAME = "policy_model.pkl"
+PLOT_FILENAMES = ["reward_distribution.png", "action_distribution.png", "feature_importance.png"]
+
+
+def index_path(base_dir=MODELS_DIR):
+    return os.path.join(base_dir, INDEX_FILENAME)
+
+
+def version_number(version):
+    return int(version[1:])
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+ROLLOUT_FILENAME = "rollout.json"
+
+
+def _metrics(config, rollout):
+    metrics = {key: config[key] for key in ("f1_macro",) if key in config}
+    if rollout:
+        metrics["survival_frames"] = rollout["survival_frames"]["mean"]
+        metrics["reward"] = rollout["reward"]["mean"]
+    return metrics
+
+
+def _entry(version, base_dir, plots_dir):
+    """Index entry for one version directory, or None if it has no config."""
+    model_dir = os.path.join(base_dir, version)
+    config_path = os.path.join(model_dir, "config.json")
+    if not os.path.exists(config_path):
+        return None
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    rollout = None
+    rollout_path = os.path.join(model_dir, ROLLOUT_FILENAME)
+    if os.path.exists(rollout_path):
+        with open(rollout_path, "r") as f:
+            rollout = json.load(f)
+
+    artifacts = {}
+    for name in sorted(os.listdir(model_dir)):
+        path = os.path.join(model_dir, name)
+        if os.path.isfile(path):
+            artifacts[name] = {"path": path, "sha256": file_checksum(path)}
+
+    return {
+        "version": version,
+        "number": version_number(version),
+        "config": config,
+        "metrics": _metrics(config, rollout),
+        "rollout": rollout,
+        "artifacts": artifacts,
+        "plots": {name: f"{plots_dir}/{version}/{name}" for name in PLOT_FILENAMES},
+        "thumbnails": {name: f"{plots_dir}/{version}/thumbs/{name}" for name in PLOT_FILENAMES},
+    }
+
+
+def save_index(index, base_dir=MODELS_DIR):
+    """Write the index atomically, so readers never see a partial file."""
+    os.makedirs(base_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=base_dir, prefix=".index-", suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_path, index_path(base_dir))
+
+
+def scan_index(base_dir=MODELS_DIR, plots_dir=PLOTS_DIR):
+    """Build an index from every version directory, without writing it."""
+    versions = {}
+    if os.path.isdir(base_dir):
+        for d in os.listdir(base_dir):
+            if d.startswith("v") and d[1:].isdigit() and os.path.isdir(os.path.join(base_dir, d)):
+                entry = _entry(d, base_dir, plots_dir)
+                if entry:
+                    versions[d] = entry
+    return {"versions": versions}
+
+
+def rebuild_index(base_dir=MODELS_DIR, plots_dir=PLOTS_DIR):
+    """Scan every version directory once and write a fresh index."""
+    index = scan_index(base_dir, plots_dir)
+    save_index(index, base_dir)
+    return index
+
+
+def load_index(base_dir=MODELS_DIR):
+    """
+    The registry index. If index.json is missing the version directories
+    are scanned in memory; only register_version and rebuild_index (the
+    CLI below) write the file, so lookups never do.
+    """
+    try:
+        with open(index_path(base_dir), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return scan_index(base_dir)
+
+
+def register_version(version, base_dir=MODELS_DIR, plots_dir=PLOTS_DIR):
+    """Add or refresh `version` in the index once its files are written."""
+    index = load_index(base_dir)
+    entry = _entry(version, base_dir, plots_dir)
+    if entry is None:
+        raise FileNotFoundError(f"{version} has no config.json in {base_dir}")
+    index["versions"][version] = entry
+    save_index(index, base_dir)
+    return entry
+
+
+def save_rollout(version, summary, base_dir=MODELS_DIR):
+    """
+    Write a version's rollout scores to rollout.json (atomically) and refresh
+    its index entry. Scores live beside config.json rather than in it, so
+    the files written at training time are never modified afterwards.
+    """
+    rollout_path = os.path.join(base_dir, version, ROLLOUT_FILENAME)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(rollout_path), prefix=".rollout-", suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(summary, f, indent=2)
+    os.replace(tmp_path, rollout_path)
+    return register_version(version, base_dir)
+
+
+def list_versions(base_dir=MODELS_DIR):
+    """Index entries, oldest version first."""
+    versions = load_index(base_dir)["versions"].values()
+    return sorted(versions, key=lambda entry: entry["number"])
+
+
+def latest_model_path(base_dir=MODELS_DIR):
+    """
+    Path of the newest registered version that has a model, or None.
+
+    Discovery trusts the index alone: a model copied into models/vN by hand
+    stays invisible (to the policy engine and the model watcher) until it
+    is registered with register_version or `python model_registry.py`.
+    """
+    for entry in reversed(list_versions(base_dir)):
+        artifact = entry["artifacts"].get(MODEL_FILENAME)
+        if artifact:
+            return artifact["path"]
+    return None
+
+
+def next_version(base_dir=MODELS_DIR):
+    """
+    Name for the next version. Directories are checked as well as the
+    index, so an unregistered half-written version is never reused.
+    """
+    numbers = [entry["number"] for entry in load_index(base_dir)["versions"].values()]
+    if os.path.isdir(base_dir):
+        numbers += [int(d[1:]) for d in os.listdir(base_dir) if d.startswith("v") and d[1:].isdigit()]
+    return f"v{max(numbers, default=0) + 1}"
+
+
+if __name__ == "__main__":
+    index = rebuild_index()
+    print(f"🗂️ Indexed {len(index['versions'])} versions into {index_path()}")
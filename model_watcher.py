@@ -0,0 +1,120 @@
+# model_watcher.py
+
+import os
+import threading
+import numpy as np
+from model_registry import index_path
+from policy_engine import registry, find_latest_model, load_policy, policy_source, ACTIONS, FEATURE_NAMES
+
+# States the candidate model must be able to classify before it goes live
+_PROBE_STATES = np.array([
+    [0, 100, 100, 50, 0],
+    [80, 50, 60, 30, 0],
+    [40, 10, 80, 40, 0],
+    [60, 60, 30, 10, 100],
+    [100, 0, 5, 0, 100],
+], dtype=float)
+
+
+def validate_policy(model):
+    """Raise ValueError unless `model` maps states to known actions."""
+    predictions = np.asarray(model.predict(_PROBE_STATES))
+    if predictions.shape != (len(_PROBE_STATES),):
+        raise ValueError(f"expected {len(_PROBE_STATES)} predictions, got shape {predictions.shape}")
+    unknown = set(predictions.tolist()) - set(ACTIONS)
+    if unknown:
+        raise ValueError(f"model predicts unknown actions: {sorted(unknown)}")
+    n_features = getattr(model, "n_features_in_", len(FEATURE_NAMES))
+    if n_features != len(FEATURE_NAMES):
+        raise ValueError(f"model expects {n_features} features, not {len(FEATURE_NAMES)}")
+
+
+class ModelWatcher:
+    """
+    Background poller that hot-swaps newly trained models into the policy
+    registry.
+
+    Each poll is one stat() of the model registry index, which
+    train_agent.py rewrites only after a version's files are complete (plus
+    one stat() per model that failed to load, to retry it once rewritten).
+    Only when something changed does the watcher look up the latest model; loading and
+    validation happen on the watcher thread, and the simulation only ever
+    sees the finished model, swapped in with a single assignment. A model
+    copied into models/vN without being registered is never picked up;
+    run `python model_registry.py` to index it.
+    """
+
+    def __init__(self, policy_registry=None, interval=3.0, on_swap=None):
+        self.registry = policy_registry or registry
+        self.interval = interval
+        self.on_swap = on_swap
+        self._signature = None
+        self._failed = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _fingerprint(self):
+        try:
+            return os.stat(index_path(self.registry.base_dir)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _retry_due(self):
+        """Whether a model that failed to load has been rewritten since (one stat per failed path)."""
+        for path, mtime in list(self._failed.items()):
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return True
+            except FileNotFoundError:
+                del self._failed[path]
+        return False
+
+    def poll(self):
+        """Check once for a newer model. Returns the path swapped in, if any."""
+        signature = self._fingerprint()
+        if signature == self._signature and not self._retry_due():
+            return None
+        self._signature = signature
+
+        model_path = find_latest_model(self.registry.base_dir)
+        if not model_path or model_path == self.registry.active_path:
+            return None
+
+        # Retry a failed path only once its file has changed (e.g. finished writing)
+        mtime = os.stat(model_path).st_mtime_ns
+        if self._failed.get(model_path) == mtime:
+            return None
+
+        try:
+            model = load_policy(model_path)
+            validate_policy(model)
+        except Exception as e:
+            self._failed[model_path] = mtime
+            print(f"[POLICY] Not loading {model_path}: {e}")
+            return None
+
+        # Anything that failed before is now superseded
+        self._failed.clear()
+        self.registry.install(model_path, model)
+        print(f"[POLICY] Hot-swapped model {policy_source(model_path)}")
+        if self.on_swap:
+            self.on_swap(model_path)
+        return model_path
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def start(self):
+        if self._thread is None:
+            self.registry.active()  # resolve the current model before watching
+            self._signature = self._fingerprint()
+            self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
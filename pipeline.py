@@ -0,0 +1,541 @@
+# pipeline.py
+
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+from datetime import datetime
+import numpy as np
+from log_loader import load_dataset, expand_paths, FEATURE_NAMES
+from model_registry import MODELS_DIR, PLOTS_DIR, MODEL_FILENAME, list_versions, next_version, register_version, file_checksum
+from policy_compiler import CompiledPolicy, COMPILED_FILENAME, verify
+
+# scikit-learn and matplotlib (via plotting) are imported inside the stages
+# that need them, so rebuilding the dashboard from the registry never pays for them.
+
+MODEL_TYPE = "DecisionTree"
+MAX_DEPTH = 5
+TEST_SPLIT = 0.2
+RANDOM_SEED = 42
+
+CACHE_DIR = ".cache"
+STAMPS_FILE = os.path.join(CACHE_DIR, "stamps.json")
+DATASET_CACHE_DIR = os.path.join(CACHE_DIR, "datasets")
+LEARNING_CURVE_FILE = os.path.join(PLOTS_DIR, "learning_curve.png")
+DASHBOARD_FILE = "dashboard.html"
+DASHBOARD_LAYOUT = 3  # bump when the dashboard template changes, so cached pages are rebuilt
+
+
+# ========== CACHE ========== #
+def content_hash(*parts):
+    """sha256 of JSON-serialisable parts and NumPy arrays."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(str((part.dtype, part.shape)).encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _path_checksums(path):
+    if os.path.isdir(path):
+        return {name: file_checksum(os.path.join(path, name)) for name in sorted(os.listdir(path))}
+    return file_checksum(path)
+
+
+def _read_stamps():
+    try:
+        with open(STAMPS_FILE, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def is_fresh(stage, key, *outputs):
+    """True if `stage` last ran with `key` and all its outputs still exist."""
+    return _read_stamps().get(stage) == key and all(os.path.exists(path) for path in outputs)
+
+
+def stamp(stage, key):
+    stamps = _read_stamps()
+    stamps[stage] = key
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=".stamps-", suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(stamps, f, indent=2)
+    os.replace(tmp_path, STAMPS_FILE)
+
+
+# ========== LOAD ========== #
+def load(paths, frame_range=None, force=False):
+    """
+    Load (X, y, rewards) from the logs in `paths`. Parsed arrays are cached
+    under .cache/datasets by a hash of the log contents, so re-training on
+    unchanged logs skips parsing them.
+    """
+    files = expand_paths(paths)
+    key = content_hash({path: _path_checksums(path) for path in files}, frame_range)
+    cache_path = os.path.join(DATASET_CACHE_DIR, f"{key}.npz")
+
+    if not force and os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            X, y, rewards = cached["X"], cached["y"], cached["rewards"]
+        print(f"📂 Loaded {len(X)} cached rows for {', '.join(files)}")
+    else:
+        X, y, rewards = load_dataset(files, frame_range=frame_range)
+        os.makedirs(DATASET_CACHE_DIR, exist_ok=True)
+        np.savez(cache_path, X=X, y=y, rewards=rewards)
+        print(f"📂 Loaded {len(X)} rows from {', '.join(files)}")
+
+    return {"X": X, "y": y, "rewards": rewards, "files": files, "key": key}
+
+
+# ========== FIT ========== #
+def training_key(dataset, params=None, grid=None):
+    """Hash of everything that decides the trained model."""
+    return content_hash(dataset["key"], params, grid, TEST_SPLIT, RANDOM_SEED)
+
+
+def find_trained(key, models_dir=MODELS_DIR):
+    """A registered version already trained with `key`, or None."""
+    for entry in reversed(list_versions(models_dir)):
+        if entry["config"].get("input_hash") == key:
+            return entry["version"]
+    return None
+
+
+def fit(dataset, params=None, grid=None, workers=None):
+    """
+    Split the dataset and fit a model: `params` directly, or the best
+    candidate of a parallel sweep over `grid` when one is given.
+    """
+    from sklearn.model_selection import train_test_split
+    from sweep import build_model, run_sweep
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        dataset["X"], dataset["y"], test_size=TEST_SPLIT, random_state=RANDOM_SEED
+    )
+
+    sweep_results = None
+    if grid is not None:
+        sweep_results = run_sweep(X_train, X_test, y_train, y_test, grid=grid,
+                                  random_seed=RANDOM_SEED, workers=workers)
+        params = sweep_results[0]["params"]
+        print(f"🏆 Best of {len(sweep_results)} candidates: f1={sweep_results[0]['f1_macro']:.3f} {json.dumps(params)}")
+
+    model = build_model(params, RANDOM_SEED)
+    model.fit(X_train, y_train)
+    return {"model": model, "params": params, "sweep_results": sweep_results, "X_test": X_test, "y_test": y_test}
+
+
+# ========== EVALUATE ========== #
+def evaluate(fitted):
+    from sklearn.metrics import classification_report, f1_score
+
+    y_pred = fitted["model"].predict(fitted["X_test"])
+    return {
+        "report": classification_report(fitted["y_test"], y_pred, output_dict=False),
+        "f1_macro": f1_score(fitted["y_test"], y_pred, average="macro"),
+    }
+
+
+# ========== ARTIFACTS ========== #
+def save_artifacts(dataset, fitted, evaluation, key, models_dir=MODELS_DIR):
+    """Write the model, compiled tree, config and report as a new registered version."""
+    model, params = fitted["model"], fitted["params"]
+    version = next_version(models_dir)
+    model_path = os.path.join(models_dir, version)
+    os.makedirs(model_path, exist_ok=True)
+
+    with open(os.path.join(model_path, "policy_model.pkl"), "wb") as f:
+        pickle.dump(model, f)
+
+    # Flattened copy of the tree so the simulator can run without scikit-learn
+    compiled = CompiledPolicy.from_model(model, FEATURE_NAMES)
+    mismatches = verify(compiled, model, dataset["X"])
+    if mismatches:
+        raise ValueError(f"Compiled policy disagrees with the trained model on {mismatches} rows")
+    compiled.save(os.path.join(model_path, COMPILED_FILENAME))
+
+    with open(os.path.join(model_path, "config.json"), "w") as f:
+        json.dump({
+            "model_type": params.get("model_type", MODEL_TYPE),
+            "max_depth": params.get("max_depth"),
+            "params": params,
+            "test_split": TEST_SPLIT,
+            "trained_on": len(dataset["X"]),
+            "data_files": dataset["files"],
+            "features": FEATURE_NAMES,
+            "timestamp": datetime.now().isoformat(),
+            "f1_macro": evaluation["f1_macro"],
+            "input_hash": key,
+        }, f, indent=2)
+
+    with open(os.path.join(model_path, "report.txt"), "w") as f:
+        f.write(evaluation["report"])
+
+    if fitted["sweep_results"]:
+        with open(os.path.join(model_path, "sweep.json"), "w") as f:
+            json.dump(fitted["sweep_results"], f, indent=2)
+
+    register_version(version, models_dir)
+    print(f"✅ Model saved to {model_path}")
+    return version
+
+
+# ========== PLOTS ========== #
+def plot_jobs(version, dataset, model, plots_dir=PLOTS_DIR):
+    """The reward, action and feature importance plot jobs for one version, and their content key."""
+    from plotting import reward_job, action_job, importance_job
+
+    importances = getattr(model, "feature_importances_", None)
+    plot_path = os.path.join(plots_dir, version)
+    jobs = [
+        reward_job(os.path.join(plot_path, "reward_distribution.png"), dataset["rewards"]),
+        action_job(os.path.join(plot_path, "action_distribution.png"), dataset["y"]),
+    ]
+    if importances is not None:
+        jobs.append(importance_job(os.path.join(plot_path, "feature_importance.png"), FEATURE_NAMES, importances))
+    return jobs, content_hash(*(data for _, _, data in jobs))
+
+
+def draw_plots(version, dataset, model, plots_dir=PLOTS_DIR, workers=None, force=False):
+    """Render one version's plots in parallel, unless they are already up to date."""
+    jobs, key = plot_jobs(version, dataset, model, plots_dir)
+    if not force and is_fresh(f"plots/{version}", key, *(path for _, path, _ in jobs)):
+        print(f"⏭️ Plots for {version} are up to date")
+        return
+
+    from plotting import render_all
+    render_all(jobs, workers)
+    stamp(f"plots/{version}", key)
+
+
+def _load_model(entry):
+    with open(entry["artifacts"][MODEL_FILENAME]["path"], "rb") as f:
+        return pickle.load(f)
+
+
+def backfill_plots(data_paths, models_dir=MODELS_DIR, plots_dir=PLOTS_DIR, workers=None, force=False):
+    """
+    Draw the plots of every registered version that is missing any, all in
+    one worker pool, and any missing thumbnails. Each version is plotted
+    from the logs recorded in its config when they still exist, otherwise
+    from `data_paths`.
+    """
+    jobs = []
+    keys = {}
+    datasets = {}
+    entries = list_versions(models_dir)
+    for entry in entries:
+        version = entry["version"]
+        if MODEL_FILENAME not in entry["artifacts"]:
+            continue
+        model = _load_model(entry)
+        paths = tuple(p for p in entry["config"].get("data_files", []) if os.path.exists(p)) or tuple(data_paths)
+        if paths not in datasets:
+            datasets[paths] = load(list(paths))
+        version_jobs, key = plot_jobs(version, datasets[paths], model, plots_dir)
+        if not force and all(os.path.exists(path) for _, path, _ in version_jobs):
+            continue
+        jobs.extend(version_jobs)
+        keys[version] = key
+
+    from plotting import render_all, make_thumbnail
+    if jobs:
+        render_all(jobs, workers)
+        for version, key in keys.items():
+            stamp(f"plots/{version}", key)
+    else:
+        print("⏭️ Every version already has its plots")
+
+    # Plots drawn before thumbnails existed
+    for entry in entries:
+        for name, path in entry["plots"].items():
+            thumb = entry.get("thumbnails", {}).get(name)
+            if thumb and os.path.exists(path) and not os.path.exists(thumb):
+                print(f"🖼️ Thumbnail {make_thumbnail(path)}")
+
+
+# ========== LEARNING CURVE ========== #
+def update_learning_curve(models_dir=MODELS_DIR, output_path=LEARNING_CURVE_FILE, force=False):
+    labels = []
+    scores = []
+    for entry in list_versions(models_dir):
+        score = entry["config"].get("f1_macro")
+        if score is not None:
+            labels.append(entry["version"])
+            scores.append(score)
+
+    if not scores:
+        print("⚠️ No valid training scores found to plot.")
+        return
+
+    key = content_hash(labels, scores)
+    if not force and is_fresh("learning_curve", key, output_path):
+        print(f"⏭️ Learning curve is up to date: {output_path}")
+        return
+
+    from plotting import learning_curve_job, render
+    render(learning_curve_job(output_path, labels, scores))
+    stamp("learning_curve", key)
+    print(f"📈 Learning curve updated: {output_path}")
+
+
+# ========== DASHBOARD ========== #
+# A static shell: rows come from /api/versions (dashboard_server.py) one page
+# at a time, or from models/index.json when the page is served as plain files
+# (live_dashboard.py). Thumbnails load only as their rows scroll into view.
+DASHBOARD_HTML = """<!DOCTYPE html>
+<html>
+<head>
+    <title>AI Agent Training Dashboard</title>
+    <style>
+        body { font-family: Arial; padding: 20px; background: #111; color: #eee; }
+        table { border-collapse: collapse; width: 100%; }
+        th, td { border: 1px solid #444; padding: 8px; text-align: center; }
+        th { background-color: #222; }
+        img { border-radius: 4px; box-shadow: 0 0 5px rgba(255,255,255,0.1); background: #1a1a1a; }
+        .config-row { background: #1a1a1a; }
+        .config-row td { padding: 12px; text-align: left; font-size: 14px; }
+        .version-row:hover { background-color: #222; cursor: pointer; }
+        .controls { margin: 10px 0; }
+        .controls button, .controls select { background: #222; color: #eee; border: 1px solid #444; padding: 4px 10px; }
+        #live-chart { background: #1a1a1a; border: 1px solid #444; }
+    </style>
+</head>
+<body>
+    <h1>AI Emotions Simulator — Training Dashboard</h1>
+    <h3>Live Simulation</h3>
+    <p id="live">Waiting for a running simulation (python main.py, or python world.py --telemetry)...</p>
+    <canvas id="live-chart" width="600" height="120"></canvas>
+
+    <h3>Model Versions</h3>
+    <div class="controls">
+        Sort by
+        <select id="sort">
+            <option value="version">Version</option>
+            <option value="f1_macro">F1 Macro</option>
+            <option value="timestamp">Trained</option>
+            <option value="survival">Rollout survival</option>
+        </select>
+        <button id="order">Descending</button>
+        <button id="prev">&larr; Prev</button>
+        <span id="page-info"></span>
+        <button id="next">Next &rarr;</button>
+    </div>
+    <p>Click a row to expand model config; click a plot to open it full size.</p>
+    <table>
+        <thead>
+            <tr>
+                <th>Version</th>
+                <th>F1 Macro</th>
+                <th>Trained</th>
+                <th>Rewards</th>
+                <th>Actions</th>
+                <th>Features</th>
+            </tr>
+        </thead>
+        <tbody id="versions"></tbody>
+    </table>
+    <br>
+    <h3>Learning Curve</h3>
+    <img src="{{PLOTS_DIR}}/learning_curve.png" width="600">
+
+    <script>
+        const PER_PAGE = 25;
+        const PLOTS = ["reward_distribution", "action_distribution", "feature_importance"];
+        let state = {page: 1, sort: "version", order: "desc"};
+
+        // Set each thumbnail's src only once its row is about to scroll into view
+        const lazyImages = "IntersectionObserver" in window ? new IntersectionObserver((entries, observer) => {
+            for (let entry of entries) {
+                if (entry.isIntersecting) {
+                    entry.target.src = entry.target.dataset.src;
+                    observer.unobserve(entry.target);
+                }
+            }
+        }, {rootMargin: "200px"}) : null;
+
+        // The same page shape as /api/versions, built from the static registry index
+        async function indexPage() {
+            let index = await (await fetch("models/index.json")).json();
+            let keys = {
+                version: e => e.number,
+                f1_macro: e => e.config.f1_macro || 0,
+                timestamp: e => e.config.timestamp || "",
+                survival: e => (e.metrics || {}).survival_frames || 0,
+            };
+            let key = keys[state.sort];
+            let entries = Object.values(index.versions).sort((a, b) => key(a) < key(b) ? -1 : key(a) > key(b) ? 1 : 0);
+            if (state.order === "desc") entries.reverse();
+            let pages = Math.max(1, Math.ceil(entries.length / PER_PAGE));
+            let page = Math.min(state.page, pages);
+            let plotUrls = paths => Object.fromEntries(Object.entries(paths || {}).map(([n, p]) => [n.replace(".png", ""), p]));
+            return {
+                page, pages, total: entries.length,
+                versions: entries.slice((page - 1) * PER_PAGE, page * PER_PAGE).map(e => ({
+                    ...e.config, version: e.version, rollout: e.rollout || null,
+                    artifacts: Object.fromEntries(Object.entries(e.artifacts || {}).map(([n, a]) => [n, "/" + a.path])),
+                    plots: plotUrls(e.plots), thumbnails: plotUrls(e.thumbnails || e.plots),
+                })),
+            };
+        }
+
+        async function fetchPage() {
+            let query = new URLSearchParams({...state, per_page: PER_PAGE});
+            try {
+                let response = await fetch(`/api/versions?${query}`);
+                if (response.ok) return await response.json();
+            } catch (e) {}
+            return indexPage();
+        }
+
+        function cell(text) {
+            let td = document.createElement("td");
+            td.textContent = text;
+            return td;
+        }
+
+        function versionRows(v) {
+            let row = document.createElement("tr");
+            row.className = "version-row";
+            row.append(cell(v.version), cell(v.f1_macro != null ? v.f1_macro.toFixed(3) : "?"), cell(v.timestamp || "unknown"));
+            for (let name of PLOTS) {
+                let td = document.createElement("td");
+                if (v.plots[name]) {
+                    let link = document.createElement("a");
+                    link.href = v.plots[name];
+                    link.target = "_blank";
+                    link.onclick = e => e.stopPropagation();
+                    let img = document.createElement("img");
+                    img.width = 200;
+                    img.height = 80;
+                    img.alt = name;
+                    img.dataset.src = v.thumbnails[name] || v.plots[name];
+                    lazyImages ? lazyImages.observe(img) : (img.src = img.dataset.src);
+                    link.append(img);
+                    td.append(link);
+                }
+                row.append(td);
+            }
+
+            let config = document.createElement("tr");
+            config.className = "config-row";
+            let td = document.createElement("td");
+            td.colSpan = 6;
+            td.style.display = "none";
+            td.innerHTML = "<b>Model:</b> <span></span><br><b>Max Depth:</b> <span></span><br>" +
+                           "<b>Trained On:</b> <span></span> samples<br><b>Features:</b> <span></span><br>" +
+                           "<b>Rollout:</b> <span></span>";
+            let r = v.rollout;
+            let rollout = r ? `survived ${r.survival_frames.mean.toFixed(0)} ± ${r.survival_frames.std.toFixed(0)} ` +
+                              `of ${r.max_frames} frames over ${r.worlds} worlds, reward ${r.reward.mean.toFixed(1)}, ` +
+                              `food ${r.food_eaten.mean.toFixed(1)}` : "not rolled out (python rollout.py " + v.version + ")";
+            let fields = [v.model_type, v.max_depth, v.trained_on, (v.features || []).join(", "), rollout];
+            td.querySelectorAll("span").forEach((span, i) => span.textContent = fields[i] ?? "?");
+            config.append(td);
+            row.onclick = () => td.style.display = td.style.display === "none" ? "" : "none";
+            return [row, config];
+        }
+
+        async function load() {
+            let data = await fetchPage();
+            state.page = data.page;
+            document.getElementById("versions").replaceChildren(...data.versions.flatMap(versionRows));
+            document.getElementById("page-info").textContent = `Page ${data.page} of ${data.pages} (${data.total} versions)`;
+            document.getElementById("prev").disabled = data.page <= 1;
+            document.getElementById("next").disabled = data.page >= data.pages;
+        }
+
+        document.getElementById("sort").onchange = e => { state.sort = e.target.value; state.page = 1; load(); };
+        document.getElementById("order").onclick = e => {
+            state.order = state.order === "desc" ? "asc" : "desc";
+            e.target.textContent = state.order === "desc" ? "Descending" : "Ascending";
+            state.page = 1;
+            load();
+        };
+        document.getElementById("prev").onclick = () => { state.page--; load(); };
+        document.getElementById("next").onclick = () => { state.page++; load(); };
+        load();
+
+        // Live aggregates from a running simulation, via dashboard_server.py
+        const VITALS = {hunger: "orange", energy: "#9600ff", health: "#0f0", stimulation: "yellow", fear_level: "red"};
+        let history = [];
+        function drawLive(samples) {
+            history = history.concat(samples).slice(-300);
+            let s = history[history.length - 1];
+            document.getElementById("live").textContent =
+                `Frame ${s.frame} · ${s.emotion} (${s.action}) · prey ${s.prey} · predators ${s.predators} · ` +
+                `agents ${s.agents} · step ${s.step_ms.toFixed(2)} ms`;
+            let canvas = document.getElementById("live-chart"), ctx = canvas.getContext("2d");
+            ctx.clearRect(0, 0, canvas.width, canvas.height);
+            for (let [name, colour] of Object.entries(VITALS)) {
+                ctx.strokeStyle = colour;
+                ctx.beginPath();
+                history.forEach((h, i) => {
+                    let x = i * canvas.width / 300, y = canvas.height * (1 - h[name] / 100);
+                    i ? ctx.lineTo(x, y) : ctx.moveTo(x, y);
+                });
+                ctx.stroke();
+            }
+        }
+        if (window.EventSource && location.protocol.startsWith("http")) {
+            new EventSource("/api/telemetry/stream").onmessage = e => {
+                let samples = JSON.parse(e.data);
+                if (samples.length) drawLive(samples);
+            };
+        }
+    </script>
+</body>
+</html>
+"""
+
+
+def generate_dashboard(plots_dir=PLOTS_DIR, output_file=DASHBOARD_FILE, force=False):
+    """Write the dashboard shell; its rows are fetched from the registry when the page loads."""
+    key = content_hash(plots_dir, DASHBOARD_LAYOUT)
+    if not force and is_fresh("dashboard", key, output_file):
+        print(f"⏭️ Dashboard is up to date: {output_file}")
+        return
+
+    with open(output_file, "w") as f:
+        f.write(DASHBOARD_HTML.replace("{{PLOTS_DIR}}", plots_dir))
+    stamp("dashboard", key)
+    print(f"📊 Dashboard updated at: {output_file}")
+
+
+def rebuild_reports(force=False):
+    """Learning curve and dashboard, from the registry index."""
+    update_learning_curve(force=force)
+    generate_dashboard(force=force)
+
+
+# ========== PIPELINE ========== #
+def train(paths, frame_range=None, params=None, grid=None, workers=None, force=False):
+    """
+    load → fit → evaluate → artifacts → plots → dashboard.
+
+    A version already trained on the same data with the same settings is
+    reused rather than trained again, unless `force` is set. Pass `grid`
+    to sweep it instead of fitting `params`. Returns the version name.
+    """
+    dataset = load(paths, frame_range, force=force)
+    if grid is None:
+        params = params or {"model_type": MODEL_TYPE, "max_depth": MAX_DEPTH}
+    key = training_key(dataset, params if grid is None else None, grid)
+
+    version = None if force else find_trained(key)
+    if version:
+        print(f"⏭️ {version} was already trained on this data with these settings")
+    else:
+        fitted = fit(dataset, params, grid, workers)
+        evaluation = evaluate(fitted)
+        version = save_artifacts(dataset, fitted, evaluation, key)
+        draw_plots(version, dataset, fitted["model"], workers=workers, force=force)
+
+    rebuild_reports(force=force)
+    return version
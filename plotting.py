@@ -0,0 +1,150 @@
+# plotting.py
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import matplotlib
+
+# Never open windows: plots are only ever written to PNG files
+matplotlib.use("Agg")
+
+REWARD_BINS = 20
+THUMBNAIL_WIDTH = 200  # the dashboard shows plots at this width
+
+
+def _plt():
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def reward_job(path, rewards):
+    """Reward histogram job. Only the bin counts are sent to the worker."""
+    counts, edges = np.histogram(rewards, bins=REWARD_BINS)
+    return ("reward_distribution", path, {"counts": counts.tolist(), "edges": edges.tolist()})
+
+
+def action_job(path, actions):
+    labels, counts = np.unique(actions, return_counts=True)
+    return ("action_distribution", path, {"labels": labels.tolist(), "counts": counts.tolist()})
+
+
+def importance_job(path, features, importances):
+    return ("feature_importance", path, {"features": list(features), "importances": list(map(float, importances))})
+
+
+def learning_curve_job(path, labels, scores):
+    return ("learning_curve", path, {"labels": labels, "scores": scores})
+
+
+def _reward_distribution(plt, data):
+    edges = data["edges"]
+    plt.figure(figsize=(10, 4))
+    plt.hist(edges[:-1], bins=edges, weights=data["counts"], color='skyblue', edgecolor='black')
+    plt.title("Reward Distribution")
+    plt.xlabel("Reward")
+    plt.ylabel("Frequency")
+    plt.grid(True)
+
+
+def _action_distribution(plt, data):
+    plt.figure(figsize=(8, 4))
+    plt.bar(data["labels"], data["counts"], color='orange')
+    plt.title("Action Label Distribution")
+    plt.ylabel("Count")
+
+
+def _feature_importance(plt, data):
+    plt.figure(figsize=(8, 4))
+    plt.bar(data["features"], data["importances"], color='green')
+    plt.title("Feature Importance")
+    plt.ylabel("Importance")
+
+
+def _learning_curve(plt, data):
+    plt.figure(figsize=(10, 5))
+    plt.plot(data["labels"], data["scores"], marker='o', linestyle='-', color='blue')
+    plt.title("Learning Curve (F1 Macro Score)")
+    plt.xlabel("Model Version")
+    plt.ylabel("F1 Macro Score")
+    plt.ylim(0, 1.05)
+    plt.grid(True)
+
+
+# Per-version plots also get a dashboard thumbnail
+THUMBNAILED = {"reward_distribution", "action_distribution", "feature_importance"}
+
+PLOTTERS = {
+    "reward_distribution": _reward_distribution,
+    "action_distribution": _action_distribution,
+    "feature_importance": _feature_importance,
+    "learning_curve": _learning_curve,
+}
+
+
+def render(job):
+    """Draw one (kind, path, data) job to its PNG (and thumbnail). Returns (path, seconds)."""
+    kind, path, data = job
+    started = time.perf_counter()
+    plt = _plt()
+    PLOTTERS[kind](plt, data)
+    plt.tight_layout()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    plt.savefig(path)
+    plt.close()
+    if kind in THUMBNAILED:
+        make_thumbnail(path)
+    return path, time.perf_counter() - started
+
+
+def thumbnail_path(path):
+    """plots/vN/name.png -> plots/vN/thumbs/name.png"""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, "thumbs", name)
+
+
+def make_thumbnail(path):
+    """Shrink a rendered plot to THUMBNAIL_WIDTH for the dashboard. Returns the thumbnail path."""
+    from PIL import Image  # installed with matplotlib
+
+    thumb = thumbnail_path(path)
+    os.makedirs(os.path.dirname(thumb), exist_ok=True)
+    with Image.open(path) as image:
+        image.thumbnail((THUMBNAIL_WIDTH, image.height))
+        image.save(thumb, optimize=True)
+    return thumb
+
+
+def _init_worker():
+    # Pay for pyplot once per worker, not once per plot
+    _plt()
+
+
+def render_all(jobs, workers=None):
+    """
+    Render plot jobs across a process pool and print each plot's time.
+    A single job is drawn in-process, where a pool would only add start-up.
+    Returns {path: seconds}.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return {}
+    started = time.perf_counter()
+    timings = {}
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers == 1:
+        results = (render(job) for job in jobs)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        results = (future.result() for future in as_completed([pool.submit(render, job) for job in jobs]))
+
+    try:
+        for path, seconds in results:
+            timings[path] = seconds
+            print(f"🖼️ {path} ({seconds * 1000:.0f} ms)")
+    finally:
+        if workers > 1:
+            pool.shutdown()
+
+    print(f"🖼️ Rendered {len(jobs)} plots in {time.perf_counter() - started:.2f}s with {workers} worker(s)")
+    return timings
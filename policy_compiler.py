@@ -0,0 +1,211 @@
+# policy_compiler.py
+
+import os
+import sys
+import json
+import pickle
+import numpy as np
+
+COMPILED_FILENAME = "policy_tree.json"
+TREE_LEAF = -1  # sklearn marks leaves with children_left == -1
+
+
+class CompiledPolicy:
+    """
+    A fitted decision tree (or forest of them) flattened into plain arrays.
+
+    Prediction walks the arrays directly: `predict_one` is a pure-Python loop
+    for the one-agent-per-frame case, `predict` advances every row one level
+    at a time with NumPy. Neither needs scikit-learn, which is only used to
+    build it in `from_model`.
+
+    Like sklearn, features are rounded to float32 before being compared with
+    the (float64) split thresholds, so predictions match `model.predict`
+    exactly.
+    """
+
+    def __init__(self, classes, trees, features=None):
+        self.classes_ = np.asarray(classes)
+        self.features = list(features or [])
+        self.trees = []
+        for tree in trees:
+            value = np.asarray(tree["value"], dtype=float)
+            proba = value / value.sum(axis=1, keepdims=True)
+            self.trees.append({
+                "feature": np.asarray(tree["feature"], dtype=np.intp),
+                "threshold": np.asarray(tree["threshold"], dtype=float),
+                "left": np.asarray(tree["left"], dtype=np.intp),
+                "right": np.asarray(tree["right"], dtype=np.intp),
+                "value": value,
+                "proba": proba,
+                "depth": int(tree["depth"]),
+            })
+        # List copies for the scalar path; indexing lists beats indexing arrays
+        self._walk = [
+            (t["feature"].tolist(), t["threshold"].tolist(), t["left"].tolist(),
+             t["right"].tolist(), t["proba"].argmax(axis=1).tolist(), t["proba"])
+            for t in self.trees
+        ]
+        self._labels = self.classes_.tolist()
+
+    @classmethod
+    def from_model(cls, model, features=None):
+        """Compile a fitted sklearn tree classifier or tree ensemble."""
+        estimators = getattr(model, "estimators_", None)
+        if estimators is None:
+            estimators = [model]
+        trees = []
+        for estimator in estimators:
+            t = estimator.tree_
+            if t.n_outputs != 1:
+                raise ValueError("only single-output classifiers can be compiled")
+            trees.append({
+                "feature": t.feature,
+                "threshold": t.threshold,
+                "left": t.children_left,
+                "right": t.children_right,
+                "value": t.value[:, 0, :],
+                "depth": t.max_depth,
+            })
+        return cls(model.classes_, trees, features)
+
+    def _leaf(self, x, walk):
+        feature, threshold, left, right = walk[:4]
+        node = 0
+        while left[node] != TREE_LEAF:
+            node = left[node] if x[feature[node]] <= threshold[node] else right[node]
+        return node
+
+    def predict_one(self, features):
+        """Predict the label for a single feature row (any sequence of numbers)."""
+        x = np.asarray(features, dtype=np.float32).tolist()
+        if len(self._walk) == 1:
+            walk = self._walk[0]
+            return self._labels[walk[4][self._leaf(x, walk)]]
+        proba = sum(walk[5][self._leaf(x, walk)] for walk in self._walk)
+        return self._labels[int(np.argmax(proba))]
+
+    def apply(self, X, tree):
+        """Leaf index reached by every row of X in `tree`."""
+        node = np.zeros(len(X), dtype=np.intp)
+        rows = np.arange(len(X))
+        for _ in range(tree["depth"]):
+            left = tree["left"][node]
+            split = left != TREE_LEAF
+            if not split.any():
+                break
+            feature = np.where(split, tree["feature"][node], 0)
+            go_left = X[rows, feature] <= tree["threshold"][node]
+            node = np.where(split, np.where(go_left, left, tree["right"][node]), node)
+        return node
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32).reshape(len(X), -1)
+        proba = sum(tree["proba"][self.apply(X, tree)] for tree in self.trees)
+        return proba / len(self.trees)
+
+    def predict(self, X):
+        """Vectorised prediction for an (N, n_features) batch."""
+        X = np.asarray(X, dtype=np.float32).reshape(len(X), -1)
+        if len(self.trees) == 1:
+            tree = self.trees[0]
+            return self.classes_[tree["proba"][self.apply(X, tree)].argmax(axis=1)]
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def to_dict(self):
+        return {
+            "classes": self._labels,
+            "features": self.features,
+            "trees": [
+                {
+                    "feature": t["feature"].tolist(),
+                    "threshold": t["threshold"].tolist(),
+                    "left": t["left"].tolist(),
+                    "right": t["right"].tolist(),
+                    "value": t["value"].tolist(),
+                    "depth": t["depth"],
+                }
+                for t in self.trees
+            ],
+        }
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls(data["classes"], data["trees"], data.get("features"))
+
+
+VERIFY_SCALAR_ROWS = 1000
+
+
+def verify(compiled, model, X, scalar_rows=VERIFY_SCALAR_ROWS, seed=0):
+    """
+    Check the compiled predictor against `model.predict`: the vectorised
+    path on every row of X, the pure-Python scalar path on a fixed-size
+    random sample of `scalar_rows` (so verifying stays cheap on millions of
+    rows). Returns the number of mismatching rows.
+    """
+    X = np.asarray(X, dtype=float)
+    if not len(X):
+        return 0
+    expected = model.predict(X)
+    wrong = compiled.predict(X) != expected
+    sample = np.random.default_rng(seed).choice(len(X), min(scalar_rows, len(X)), replace=False)
+    scalar = np.array([compiled.predict_one(row) for row in X[sample]])
+    wrong[sample] |= scalar != expected[sample]
+    return int(np.sum(wrong))
+
+
+VERIFY_MAX_ROWS = 200_000
+
+
+def compile_model(model_path, data_files=None, max_rows=VERIFY_MAX_ROWS):
+    """
+    Compile `model_path` into policy_tree.json next to it, checking it
+    against the model's own predictions on up to `max_rows` rows of the
+    agent log (`data_files`: paths or globs, default the current
+    agent_log.jsonl). The log is streamed chunk by chunk, so only the rows
+    checked are ever held in memory.
+    """
+    from policy_engine import FEATURE_NAMES
+    from action_log import LOG_FILE
+    from log_loader import iter_chunks
+
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    compiled = CompiledPolicy.from_model(model, FEATURE_NAMES)
+
+    parts, rows = [], 0
+    try:
+        for X, _, _ in iter_chunks(data_files or [LOG_FILE], chunk_size=min(max_rows, 65536)):
+            parts.append(X[:max_rows - rows])
+            rows += len(parts[-1])
+            if rows >= max_rows:
+                break
+    except FileNotFoundError:
+        print(f"⚠️ No agent log to check {model_path} against")
+    if rows:
+        X = np.concatenate(parts)
+        mismatches = verify(compiled, model, X)
+        if mismatches:
+            raise ValueError(f"compiled policy disagrees with {model_path} on {mismatches}/{len(X)} rows")
+        print(f"✅ Compiled policy matches model on {len(X)} logged rows")
+
+    out_path = os.path.join(os.path.dirname(model_path), COMPILED_FILENAME)
+    compiled.save(out_path)
+    print(f"🌲 Compiled {model_path} -> {out_path}")
+    return out_path
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:]
+    if not paths:
+        print("Usage: python policy_compiler.py models/vN/policy_model.pkl [...]")
+        sys.exit(1)
+    for path in paths:
+        compile_model(path)
@@ -1,41 +1,149 @@
+import time
+
+# Measured for PolicyRegistry.startup_report
+_import_started = time.perf_counter()
+
 import os
+import sys
 import pickle
+import argparse
+import threading
+import numpy as np
+from policy_compiler import CompiledPolicy, COMPILED_FILENAME
+from model_registry import latest_model_path
+
+FEATURE_NAMES = ["hunger", "energy", "health", "stimulation", "fear_level"]
+ACTIONS = ["flee", "seek_food", "rest", "wander", "idle", "do_nothing"]
 
 def find_latest_model(base_dir="models"):
+    """Newest registered model (see model_registry.latest_model_path: unregistered copies are not found)."""
     if not os.path.exists(base_dir):
         return None
+    return latest_model_path(base_dir)
+
+def policy_source(model_path):
+    """The file load_policy reads for `model_path`: the compiled policy_tree.json beside it, if any."""
+    compiled_path = os.path.join(os.path.dirname(model_path), COMPILED_FILENAME)
+    return compiled_path if os.path.exists(compiled_path) else model_path
+
+def load_policy(model_path):
+    """
+    Load a policy for `model_path`, preferring the compiled policy_tree.json
+    beside it (no scikit-learn needed). Pickled trees without one are
+    compiled on load; other models are used as-is.
+    """
+    source = policy_source(model_path)
+    if source != model_path:
+        return CompiledPolicy.load(source)
+
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    try:
+        return CompiledPolicy.from_model(model, FEATURE_NAMES)
+    except (AttributeError, ValueError):
+        return model
+
+
+class PolicyRegistry:
+    """
+    Lazily resolved policy models.
+
+    Nothing touches the disk until the first policy is requested: `active`
+    then finds the latest model under `base_dir` and loads it. Loaded
+    models are cached per path, and discovery/load times are kept for
+    `startup_report`.
+    """
+
+    def __init__(self, base_dir="models"):
+        self.base_dir = base_dir
+        self._models = {}
+        self._load_seconds = {}
+        self._discovery_seconds = None
+        self._active_path = None
+        self._resolved = False
+        self._lock = threading.Lock()
+
+    def load(self, model_path):
+        """Return the policy for `model_path`, loading it on first use."""
+        model = self._models.get(model_path)
+        if model is None:
+            with self._lock:
+                model = self._models.get(model_path)
+                if model is None:
+                    started = time.perf_counter()
+                    model = load_policy(model_path)
+                    self._load_seconds[model_path] = time.perf_counter() - started
+                    self._models[model_path] = model
+        return model
+
+    def _resolve(self):
+        started = time.perf_counter()
+        model_path = find_latest_model(self.base_dir)
+        self._discovery_seconds = time.perf_counter() - started
+        if model_path:
+            self.load(model_path)
+            print(f"[POLICY] Loaded model from {policy_source(model_path)}")
+        else:
+            print("[POLICY] No trained model found — using fallback rules.")
+        self._active_path = model_path
+        self._resolved = True
 
-    versions = [d for d in os.listdir(base_dir) if d.startswith("v") and os.path.isdir(os.path.join(base_dir, d))]
-    versions.sort(key=lambda v: int(v[1:]), reverse=True)
+    def active(self):
+        """The policy evaluate_policy uses, or None for the fallback rules."""
+        if not self._resolved:
+            self._resolve()
+        return self._models.get(self._active_path) if self._active_path else None
 
-    for version in versions:
-        model_path = os.path.join(base_dir, version, "policy_model.pkl")
-        if os.path.exists(model_path):
-            return model_path
+    @property
+    def active_path(self):
+        if not self._resolved:
+            self._resolve()
+        return self._active_path
 
-    return None
+    def set_active(self, model_path):
+        """Make `model_path` the active policy (None selects the fallback rules)."""
+        if model_path:
+            self.load(model_path)
+        self._active_path = model_path
+        self._resolved = True
 
-# Try to load the latest policy model
-_policy_model = None
-_model_path = find_latest_model()
+    def install(self, model_path, model):
+        """
+        Swap in an already-loaded `model` as the active policy. The swap is a
+        single assignment, so a running simulation never sees a half-loaded
+        model.
+        """
+        self._models[model_path] = model
+        self._active_path = model_path
+        self._resolved = True
 
-if _model_path:
-    with open(_model_path, "rb") as f:
-        _policy_model = pickle.load(f)
-    print(f"[POLICY] Loaded model from {_model_path}")
-else:
-    print("[POLICY] No trained model found — using fallback rules.")
+    def startup_report(self):
+        """Seconds spent importing this module, finding and loading models."""
+        return {
+            "import_seconds": IMPORT_SECONDS,
+            "discovery_seconds": self._discovery_seconds,
+            "load_seconds": dict(self._load_seconds),
+            "active_model": self._active_path,
+            "compiled": isinstance(self._models.get(self._active_path), CompiledPolicy),
+            "sklearn_imported": "sklearn" in sys.modules,
+        }
+
+
+registry = PolicyRegistry()
 
 def evaluate_policy(state, context):
-    if _policy_model:
-        features = [[
+    model = registry.active()
+    if model:
+        features = [
             state["hunger"],
             state["energy"],
             state["health"],
             state["stimulation"],
             state["fear_level"]
-        ]]
-        return _policy_model.predict(features)[0]
+        ]
+        if isinstance(model, CompiledPolicy):
+            return model.predict_one(features)
+        return model.predict([features])[0]
 
     # Fallback logic
     if state["health"] <= 0:
@@ -49,3 +157,53 @@ def evaluate_policy(state, context):
     if context.get("novelty_trigger", False):
         return "wander"
     return "idle"
+
+
+def evaluate_policy_batch(state, context):
+    """
+    Vectorised evaluate_policy: `state` and `context` hold one array entry
+    per agent, and the model is asked for every agent in a single call.
+    """
+    model = registry.active()
+    if model:
+        features = np.column_stack([np.asarray(state[f], dtype=float) for f in FEATURE_NAMES])
+        if not len(features):
+            return np.empty(0, dtype=str)
+        return model.predict(features)
+
+    # Fallback logic
+    shape = np.shape(state["hunger"])
+    predators_nearby = np.broadcast_to(context.get("predators_nearby", False), shape)
+    prey_visible = np.broadcast_to(context.get("prey_visible", False), shape)
+    novelty = np.broadcast_to(context.get("novelty_trigger", False), shape)
+    return np.select(
+        [
+            np.asarray(state["health"]) <= 0,
+            (np.asarray(state["fear_level"]) > 60) & predators_nearby,
+            (np.asarray(state["hunger"]) > 70) & prey_visible,
+            np.asarray(state["energy"]) < 20,
+            novelty,
+        ],
+        ["do_nothing", "flee", "seek_food", "rest", "wander"],
+        default="idle",
+    )
+
+
+IMPORT_SECONDS = time.perf_counter() - _import_started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report policy engine cold-start times.")
+    parser.add_argument("--budget", type=float, default=None, help="fail if import + load exceeds this many seconds")
+    args = parser.parse_args()
+
+    registry.active()
+    report = registry.startup_report()
+    total = report["import_seconds"] + (report["discovery_seconds"] or 0) + sum(report["load_seconds"].values())
+    print(f"⏱️ import {report['import_seconds'] * 1000:.1f} ms, "
+          f"discovery {(report['discovery_seconds'] or 0) * 1000:.1f} ms, "
+          f"load {sum(report['load_seconds'].values()) * 1000:.1f} ms "
+          f"({report['active_model']}, compiled={report['compiled']}, sklearn={report['sklearn_imported']})")
+    if args.budget is not None and total > args.budget:
+        print(f"❌ Cold start {total:.3f}s exceeds budget of {args.budget:.3f}s")
+        sys.exit(1)
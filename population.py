@@ -0,0 +1,248 @@
+# population.py
+
+import numpy as np
+import pygame
+
+
+def random_directions(n, rng):
+    """`n` random unit vectors as an (n, 2) array, drawn from the Generator `rng`."""
+    d = rng.uniform(-1, 1, (n, 2))
+    length = np.hypot(d[:, 0], d[:, 1])
+    length[length == 0] = 1
+    return d / length[:, None]
+
+
+class Population:
+    """
+    Structure-of-arrays store for a group of identical entities.
+
+    Every per-entity attribute is a column in a contiguous NumPy array, so
+    movement and collision rules run as whole-array operations. Columns are
+    exposed as attributes (`pop.x`, `pop.dx`, ...) sliced to the live count;
+    they are re-sliced whenever entities are added or removed, so don't hold
+    on to them across those calls.
+
+    Each entity has an id that is never reused. Ids only ever grow and
+    removal keeps the remaining rows in order, so the id column stays sorted
+    and `row_of` is a binary search.
+
+    All randomness comes from `rng`, a NumPy Generator. A World hands the
+    same seeded Generator to every population, so a seed reproduces a run.
+    """
+
+    # name -> dtype; subclasses extend this with their own columns
+    COLUMNS = {
+        "id": np.int64,
+        "x": float,
+        "y": float,
+        "dx": float,
+        "dy": float,
+        "speed": float,
+        "radius": float,
+    }
+    view_class = None
+
+    def __init__(self, capacity=64, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._count = 0
+        self._next_id = 0
+        self._columns = {name: np.zeros(capacity, dtype) for name, dtype in self.COLUMNS.items()}
+        self._refresh()
+
+    def _refresh(self):
+        for name, column in self._columns.items():
+            setattr(self, name, column[:self._count])
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self._count
+        if not 0 <= row < self._count:
+            raise IndexError("population index out of range")
+        return self.view_class(self, row)
+
+    def __iter__(self):
+        return (self.view_class(self, row) for row in range(self._count))
+
+    def positions(self):
+        return np.column_stack((self.x, self.y))
+
+    def row_of(self, entity_id):
+        """Current row of `entity_id`, or -1 if it has been removed."""
+        row = int(np.searchsorted(self.id, entity_id))
+        if row < self._count and self.id[row] == entity_id:
+            return row
+        return -1
+
+    def add(self, **values):
+        """
+        Append entities. Each keyword is a column name mapped to a scalar or
+        an array; the count is taken from the longest array. Returns the rows
+        of the new entities.
+        """
+        n = max((np.size(v) for v in values.values()), default=1)
+        start = self._count
+        needed = start + n
+        capacity = len(self._columns["id"])
+        if needed > capacity:
+            capacity = max(needed, capacity * 2)
+            for name, column in self._columns.items():
+                grown = np.zeros(capacity, column.dtype)
+                grown[:start] = column[:start]
+                self._columns[name] = grown
+
+        for name, value in values.items():
+            self._columns[name][start:needed] = value
+        self._columns["id"][start:needed] = np.arange(self._next_id, self._next_id + n)
+        self._next_id += n
+        self._count = needed
+        self._refresh()
+        return np.arange(start, needed)
+
+    def kill(self, rows):
+        """Remove the entities at `rows`, keeping the others in order."""
+        rows = np.asarray(rows, dtype=int)
+        if not len(rows):
+            return
+        keep = np.ones(self._count, dtype=bool)
+        keep[rows] = False
+        remaining = int(keep.sum())
+        for column in self._columns.values():
+            column[:remaining] = column[:self._count][keep]
+        self._count = remaining
+        self._refresh()
+
+    def remove(self, entity):
+        """List-style removal of a single view."""
+        row = entity.row
+        if row < 0:
+            raise ValueError("entity is not in this population")
+        self.kill([row])
+
+    def pop(self, row=-1):
+        entity = self[row]
+        self.kill([entity.row])
+        return entity
+
+    def columns(self):
+        """{name: live rows of the column}, e.g. for a snapshot. Not copies."""
+        return {name: column[:self._count] for name, column in self._columns.items()}
+
+    def load_columns(self, columns, next_id):
+        """
+        Replace every entity with `columns` ({name: array}, as returned by
+        `columns()`), taking ownership of the arrays. Columns missing from
+        `columns` are zero-filled; `next_id` is where new ids continue from.
+        """
+        count = len(columns["id"])
+        self._columns = {
+            name: columns[name] if name in columns else np.zeros(count, dtype)
+            for name, dtype in self.COLUMNS.items()
+        }
+        self._count = count
+        self._next_id = next_id
+        self._refresh()
+
+    @property
+    def next_id(self):
+        return self._next_id
+
+    def clamp_to(self, width, height):
+        np.clip(self.x, self.radius, width - self.radius, out=self.x)
+        np.clip(self.y, self.radius, height - self.radius, out=self.y)
+
+
+class EntityView:
+    """
+    Lightweight handle on one row of a Population, for rendering and for
+    code that reads `.x` / `.y` off individual entities.
+
+    A view follows its entity by id, so it stays valid when other entities
+    are removed. Once its own entity is gone it keeps reporting the last
+    position it saw, like a removed object would, and other attributes read
+    as None; writing to it raises ValueError.
+    """
+
+    __slots__ = ("population", "id", "_row", "_x", "_y")
+
+    def __init__(self, population, row):
+        self.population = population
+        self.id = int(population.id[row])
+        self._row = row
+        self._x = float(population.x[row])
+        self._y = float(population.y[row])
+
+    @property
+    def row(self):
+        pop = self.population
+        if self._row >= len(pop) or pop.id[self._row] != self.id:
+            self._row = pop.row_of(self.id)
+        return self._row
+
+    @property
+    def alive(self):
+        return self.row >= 0
+
+    def _live_row(self):
+        row = self.row
+        if row < 0:
+            raise ValueError("entity is no longer in its population")
+        return row
+
+    def _get(self, name):
+        row = self.row
+        return float(getattr(self.population, name)[row]) if row >= 0 else None
+
+    @property
+    def x(self):
+        row = self.row
+        if row >= 0:
+            self._x = float(self.population.x[row])
+        return self._x
+
+    @x.setter
+    def x(self, value):
+        self.population.x[self._live_row()] = value
+
+    @property
+    def y(self):
+        row = self.row
+        if row >= 0:
+            self._y = float(self.population.y[row])
+        return self._y
+
+    @y.setter
+    def y(self, value):
+        self.population.y[self._live_row()] = value
+
+    @property
+    def radius(self):
+        return self._get("radius")
+
+    @property
+    def speed(self):
+        return self._get("speed")
+
+    @property
+    def direction(self):
+        row = self.row
+        if row < 0:
+            return None
+        return pygame.Vector2(self.population.dx[row], self.population.dy[row])
+
+    def get_position(self):
+        return pygame.Vector2(self.x, self.y)
+
+    def __eq__(self, other):
+        return isinstance(other, EntityView) and other.population is self.population and other.id == self.id
+
+    def __hash__(self):
+        return hash((id(self.population), self.id))
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.id}, x={self.x:.1f}, y={self.y:.1f})"
@@ -1,58 +1,105 @@
 import pygame
-import random
+import numpy as np
 from settings import *
+from population import Population, EntityView, random_directions
 
-class Predator:
-    def __init__(self):
-        self.radius = 10
-        self.x = random.randint(self.radius, SCREEN_WIDTH - self.radius)
-        self.y = random.randint(self.radius, SCREEN_HEIGHT - self.radius)
-        self.colour = PREDATOR_COLOUR
-        self.speed = 2
-        self.direction = pygame.Vector2(0, 0)
-
-    def update(self, prey_list, predator_list):
-        my_pos = pygame.Vector2(self.x, self.y)
-
-        # Choose prey only if uniquely closest to it
-        def is_my_target(prey):
-            my_distance = my_pos.distance_to(prey.get_position())
-            for other in predator_list:
-                if other is self:
-                    continue
-                other_dist = pygame.Vector2(other.x, other.y).distance_to(prey.get_position())
-                if other_dist < my_distance:
-                    return False
-            return True
-
-        my_targets = [p for p in prey_list if is_my_target(p)]
-
-        if my_targets:
-            closest = min(my_targets, key=lambda p: my_pos.distance_to(p.get_position()))
-            self.direction = (closest.get_position() - my_pos).normalize()
-        else:
-            if random.random() < 0.02:
-                self.direction = pygame.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()
 
-        # Move
-        self.x += self.direction.x * self.speed
-        self.y += self.direction.y * self.speed
+def assign_targets(prey_positions, predator_positions):
+    """
+    Pick each predator's target in one pass.
 
-        # Clamp to screen
-        self.x = max(self.radius, min(SCREEN_WIDTH - self.radius, self.x))
-        self.y = max(self.radius, min(SCREEN_HEIGHT - self.radius, self.y))
-        
-        self.current_target = closest if my_targets else None
+    A prey is a candidate for a predator when no other predator is strictly
+    closer to it (ties are shared); each predator then chases its closest
+    candidate. Returns, per predator, the target's row in `prey_positions`
+    (-1 when it has no candidates) and the distance to it.
+    """
+    n_predators = len(predator_positions)
+    if not len(prey_positions) or not n_predators:
+        return np.full(n_predators, -1), np.full(n_predators, np.inf)
+
+    dist = np.hypot(predator_positions[:, None, 0] - prey_positions[None, :, 0],
+                    predator_positions[:, None, 1] - prey_positions[None, :, 1])
+    mine = dist <= dist.min(axis=0)
+    candidate_dist = np.where(mine, dist, np.inf)
+    target = candidate_dist.argmin(axis=1)
+    target_dist = candidate_dist[np.arange(n_predators), target]
+    target[np.isinf(target_dist)] = -1
+    return target, target_dist
+
+
+class Predator(EntityView):
+    __slots__ = ()
 
+    colour = PREDATOR_COLOUR
+
+    @property
+    def current_target(self):
+        row = self.row
+        target_id = self.population.target_id[row] if row >= 0 else -1
+        return self.population.targets.get(target_id)
 
     def draw(self, screen):
-        pygame.draw.circle(screen, self.colour, (int(self.x), int(self.y)), self.radius)
+        pygame.draw.circle(screen, self.colour, (int(self.x), int(self.y)), int(self.radius))
 
         # Draw targeting line if in debug mode
-        if hasattr(self, "current_target") and self.current_target:
+        target = self.current_target
+        if target:
             start = (int(self.x), int(self.y))
-            end = (int(self.current_target.x), int(self.current_target.y))
+            end = (int(target.x), int(target.y))
             pygame.draw.line(screen, (255, 100, 100), start, end, 1)
 
-    def get_position(self):
-        return pygame.Vector2(self.x, self.y)
+
+class PredatorPopulation(Population):
+    COLUMNS = {**Population.COLUMNS, "target_id": np.int64}
+    view_class = Predator
+
+    def __init__(self, count=0, rng=None):
+        super().__init__(capacity=max(8, count), rng=rng)
+        # target id -> view of the chased prey, refreshed every update
+        self.targets = {}
+        self.spawn(count)
+
+    def spawn(self, n):
+        if n <= 0:
+            return np.empty(0, dtype=int)
+        radius = 10
+        return self.add(
+            x=self.rng.integers(radius, SCREEN_WIDTH - radius + 1, n),
+            y=self.rng.integers(radius, SCREEN_HEIGHT - radius + 1, n),
+            dx=0, dy=0,
+            speed=2,
+            radius=radius,
+            target_id=-1,
+        )
+
+    def update(self, prey):
+        """Chase the closest prey this predator is (jointly) closest to, else roam."""
+        target, _ = assign_targets(prey.positions(), self.positions())
+        hunting = target >= 0
+
+        if hunting.any():
+            to_x = prey.x[target[hunting]] - self.x[hunting]
+            to_y = prey.y[target[hunting]] - self.y[hunting]
+            length = np.hypot(to_x, to_y)
+            moved = length > 0
+            rows = np.flatnonzero(hunting)[moved]
+            self.dx[rows] = to_x[moved] / length[moved]
+            self.dy[rows] = to_y[moved] / length[moved]
+
+        roaming = np.flatnonzero(~hunting)
+        turning = roaming[self.rng.random(len(roaming)) < 0.02]
+        if len(turning):
+            d = random_directions(len(turning), self.rng)
+            self.dx[turning] = d[:, 0]
+            self.dy[turning] = d[:, 1]
+
+        # Move
+        self.x += self.dx * self.speed
+        self.y += self.dy * self.speed
+
+        # Clamp to screen
+        self.clamp_to(SCREEN_WIDTH, SCREEN_HEIGHT)
+
+        self.target_id[:] = -1
+        self.target_id[hunting] = prey.id[target[hunting]]
+        self.targets = {int(prey.id[row]): prey[row] for row in np.unique(target[hunting])}
@@ -1,49 +1,69 @@
 # prey.py
 
 import pygame
-import random
+import numpy as np
 from settings import *
+from population import Population, EntityView, random_directions
 
-class Prey:
-    def __init__(self):
-        self.radius = 6
-        self.x = random.randint(self.radius, SCREEN_WIDTH - self.radius)
-        self.y = random.randint(self.radius, SCREEN_HEIGHT - self.radius)
-        self.colour = PREY_COLOUR
 
-        self.direction = pygame.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()
-        self.speed = 1.5
-        self.breed_timer = random.randint(300, 600)  # frames (~5–10 sec at 60 FPS)
+class Prey(EntityView):
+    __slots__ = ()
 
+    colour = PREY_COLOUR
 
-    def update(self, prey_list):
-        # Movement
-        self.x += self.direction.x * self.speed
-        self.y += self.direction.y * self.speed
+    @property
+    def breed_timer(self):
+        row = self.row
+        return int(self.population.breed_timer[row]) if row >= 0 else None
 
-        # Bounce off walls
-        if self.x <= self.radius or self.x >= SCREEN_WIDTH - self.radius:
-            self.direction.x *= -1
-        if self.y <= self.radius or self.y >= SCREEN_HEIGHT - self.radius:
-            self.direction.y *= -1
+    def draw(self, screen):
+        pygame.draw.circle(screen, self.colour, (int(self.x), int(self.y)), int(self.radius))
 
-        # Breeding logic
-        self.breed_timer -= 1
-        if self.breed_timer <= 0 and len(prey_list) < 100:
-            prey_list.append(self.spawn_child())
-            self.breed_timer = random.randint(300, 600)
 
-    def spawn_child(self):
-        child = Prey()
-        # Spawn near current position
-        child.x = min(max(self.x + random.randint(-15, 15), child.radius), SCREEN_WIDTH - child.radius)
-        child.y = min(max(self.y + random.randint(-15, 15), child.radius), SCREEN_HEIGHT - child.radius)
-        return child
+class PreyPopulation(Population):
+    COLUMNS = {**Population.COLUMNS, "breed_timer": np.int64}
+    view_class = Prey
 
-    
+    def __init__(self, count=0, max_size=MAX_PREY, rng=None):
+        super().__init__(capacity=max(64, count), rng=rng)
+        self.max_size = max_size
+        self.spawn(count)
 
-    def draw(self, screen):
-        pygame.draw.circle(screen, self.colour, (int(self.x), int(self.y)), self.radius)
+    def spawn(self, n, near=None):
+        """
+        Add `n` prey at random positions, or within 15px of the (n, 2)
+        `near` positions (used for offspring).
+        """
+        if n <= 0:
+            return np.empty(0, dtype=int)
+        radius = 6
+        if near is None:
+            x = self.rng.integers(radius, SCREEN_WIDTH - radius + 1, n)
+            y = self.rng.integers(radius, SCREEN_HEIGHT - radius + 1, n)
+        else:
+            x = np.clip(near[:, 0] + self.rng.integers(-15, 16, n), radius, SCREEN_WIDTH - radius)
+            y = np.clip(near[:, 1] + self.rng.integers(-15, 16, n), radius, SCREEN_HEIGHT - radius)
+        d = random_directions(n, self.rng)
+        return self.add(
+            x=x, y=y, dx=d[:, 0], dy=d[:, 1],
+            speed=1.5,
+            radius=radius,
+            breed_timer=self.rng.integers(300, 601, n),  # frames (~5–10 sec at 60 FPS)
+        )
 
-    def get_position(self):
-        return pygame.Vector2(self.x, self.y)
+    def update(self):
+        # Movement
+        self.x += self.dx * self.speed
+        self.y += self.dy * self.speed
+
+        # Bounce off walls
+        self.dx[(self.x <= self.radius) | (self.x >= SCREEN_WIDTH - self.radius)] *= -1
+        self.dy[(self.y <= self.radius) | (self.y >= SCREEN_HEIGHT - self.radius)] *= -1
+
+        # Breeding logic: ready prey breed in order until the population cap
+        self.breed_timer -= 1
+        ready = np.flatnonzero(self.breed_timer <= 0)
+        parents = ready[:max(0, self.max_size - len(self))]
+        if len(parents):
+            self.breed_timer[parents] = self.rng.integers(300, 601, len(parents))
+            self.spawn(len(parents), near=self.positions()[parents])
@@ -0,0 +1,108 @@
+# profiler.py
+
+import json
+import os
+import time
+from collections import deque
+import numpy as np
+
+PROFILE_WINDOW = 300  # frames the rolling percentiles cover (5 seconds at 60 FPS)
+
+
+class FrameProfiler:
+    """
+    Where each frame's time goes, stage by stage.
+
+    A frame is bracketed by `begin_frame()` / `end_frame()`, and code calls
+    `lap("stage")` when it finishes a stage: the stage is charged with the
+    time since the previous lap, so stages are consecutive and add up to
+    the frame. Rolling percentiles cover the last `window` frames, and with
+    `trace=True` every lap is also kept for `export_trace`.
+
+    Instrumented code holds an optional profiler attribute (None by default)
+    and only calls it behind `if profiler is not None`, so a run without a
+    profiler pays one attribute check per stage.
+    """
+
+    def __init__(self, window=PROFILE_WINDOW, trace=False):
+        self.window = window
+        self.trace = trace
+        self.frames = 0
+        self.durations = {}  # stage -> deque of the last `window` durations (seconds)
+        self.events = []  # (stage, start, duration) for the trace
+        self._laps = []
+        self._frame_start = self._last = time.perf_counter()
+        self._origin = self._frame_start
+
+    def attach(self, world):
+        """Profile `world.step()`, including the agents' update stages."""
+        world.profiler = self
+        world.agents.profiler = self
+        return self
+
+    @staticmethod
+    def detach(world):
+        world.profiler = None
+        world.agents.profiler = None
+
+    def begin_frame(self):
+        self._frame_start = self._last = time.perf_counter()
+        self._laps.clear()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self._laps.append((stage, self._last, now - self._last))
+        self._last = now
+
+    def end_frame(self):
+        now = time.perf_counter()
+        self.frames += 1
+        self._laps.append(("frame", self._frame_start, now - self._frame_start))
+        for stage, start, duration in self._laps:
+            samples = self.durations.get(stage)
+            if samples is None:
+                samples = self.durations[stage] = deque(maxlen=self.window)
+            samples.append(duration)
+        if self.trace:
+            self.events.extend(self._laps)
+        self._laps = []
+
+    def percentiles(self, percentiles=(50, 95, 99)):
+        """{stage: {"p50": ms, "p95": ms, "p99": ms, "mean": ms}} over the rolling window, in stage order."""
+        stats = {}
+        for stage, samples in self.durations.items():
+            ms = np.fromiter(samples, float, len(samples)) * 1000
+            stats[stage] = {f"p{p}": float(v) for p, v in zip(percentiles, np.percentile(ms, percentiles))}
+            stats[stage]["mean"] = float(ms.mean())
+        return stats
+
+    def report(self):
+        """Percentile table as printable lines."""
+        lines = [f"{'stage':<18}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'mean ms':>9}"]
+        for stage, s in self.percentiles().items():
+            lines.append(f"{stage:<18}{s['p50']:>9.3f}{s['p95']:>9.3f}{s['p99']:>9.3f}{s['mean']:>9.3f}")
+        return lines
+
+    def export_trace(self, path):
+        """
+        Write the recorded laps as a Chrome trace (open it in chrome://tracing
+        or https://ui.perfetto.dev). Frames and stages are on separate tracks.
+        """
+        trace_events = [
+            {"name": "thread_name", "ph": "M", "pid": 0, "tid": 0, "args": {"name": "frames"}},
+            {"name": "thread_name", "ph": "M", "pid": 0, "tid": 1, "args": {"name": "stages"}},
+        ]
+        for stage, start, duration in self.events:
+            trace_events.append({
+                "name": stage,
+                "cat": "frame" if stage == "frame" else "stage",
+                "ph": "X",
+                "pid": 0,
+                "tid": 0 if stage == "frame" else 1,
+                "ts": round((start - self._origin) * 1e6, 3),
+                "dur": round(duration * 1e6, 3),
+            })
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+        return len(trace_events)
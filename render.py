@@ -0,0 +1,83 @@
+# render.py
+
+from functools import lru_cache
+from itertools import repeat
+import numpy as np
+import pygame
+
+
+class CachedFont:
+    """
+    A pygame Font whose `render` reuses surfaces for text it has drawn before.
+
+    Labels such as "Health: 73" only take a few hundred distinct values, so
+    after the first few seconds no frame renders any text at all. The cache
+    is keyed by (text, antialias, colour, background) and simply starts over
+    once it holds `max_entries` surfaces.
+    """
+
+    def __init__(self, font, max_entries=1024):
+        self.font = font
+        self.max_entries = max_entries
+        self._surfaces = {}
+
+    def render(self, text, antialias, colour, background=None):
+        key = (text, antialias, tuple(colour), background and tuple(background))
+        surface = self._surfaces.get(key)
+        if surface is None:
+            if len(self._surfaces) >= self.max_entries:
+                self._surfaces.clear()
+            surface = self._surfaces[key] = self.font.render(text, antialias, colour, background)
+        return surface
+
+    def __getattr__(self, name):
+        return getattr(self.font, name)
+
+
+@lru_cache(maxsize=None)
+def circle_sprite(colour, radius):
+    """
+    A filled circle of `radius`, drawn once per (colour, radius). The corners
+    are a run-length encoded colour key rather than per-pixel alpha, which
+    is cheaper to blit.
+    """
+    key = (0, 0, 0) if colour != (0, 0, 0) else (255, 255, 255)
+    surface = pygame.Surface((radius * 2, radius * 2))
+    surface.fill(key)
+    pygame.draw.circle(surface, colour, (radius, radius), radius)
+    surface.set_colorkey(key, pygame.RLEACCEL)
+    return surface.convert() if pygame.display.get_surface() else surface
+
+
+@lru_cache(maxsize=None)
+def translucent_panel(width, height, rgba=(0, 0, 0, 160)):
+    panel = pygame.Surface((width, height), pygame.SRCALPHA)
+    panel.fill(rgba)
+    return panel
+
+
+def draw_circles(screen, population, colour):
+    """
+    Draw every entity of `population` as a `colour` circle with one
+    `Surface.blits` call per distinct radius, instead of one
+    `pygame.draw.circle` call per entity.
+    """
+    if not population:
+        return
+    radius = population.radius.astype(int)
+    x = population.x.astype(int)
+    y = population.y.astype(int)
+    radii = np.unique(radius)
+    for r in radii:
+        rows = radius == r if len(radii) > 1 else slice(None)
+        corners = np.column_stack((x[rows] - r, y[rows] - r)).tolist()
+        screen.blits(zip(repeat(circle_sprite(colour, int(r))), corners), doreturn=False)
+
+
+def draw_target_lines(screen, predators, colour=(255, 100, 100)):
+    """Line from each chasing predator to its prey."""
+    for row in np.flatnonzero(predators.target_id >= 0):
+        target = predators.targets.get(predators.target_id[row])
+        if target:
+            start = (int(predators.x[row]), int(predators.y[row]))
+            pygame.draw.line(screen, colour, start, (int(target.x), int(target.y)), 1)
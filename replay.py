@@ -0,0 +1,361 @@
+# replay.py
+
+import os
+import json
+import zlib
+import struct
+import argparse
+from bisect import bisect_right
+from collections import namedtuple
+import numpy as np
+from settings import *
+from agent import Agent, PREY_TARGET, PREDATOR_TARGET
+
+REPLAY_FILE = "world.replay"
+MAGIC = b"AIEREPLY"
+INDEX_MAGIC = b"AIEINDEX"
+FORMAT = 1
+KEYFRAME_INTERVAL = 300  # frames per chunk; each chunk starts with a keyframe
+QUANT = 4  # positions are stored in quarter pixels
+
+FILE_HEADER = struct.Struct("<8sI")  # magic, format
+CHUNK_HEADER = struct.Struct("<IIII")  # first frame index, frames, raw bytes, compressed bytes
+FOOTER = struct.Struct("<Q8s")  # offset of the JSON index, INDEX_MAGIC
+KEY, DELTA = 0, 1
+POP_KEY = struct.Struct("<BI")  # KEY, count
+POP_DELTA = struct.Struct("<BIB")  # DELTA, new entities, bytes per position delta
+FRAME = struct.Struct("<I")  # world frame number
+AGENT_COUNT = struct.Struct("<H")
+DELTA_TYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+AGENT_VITALS = ["health", "hunger", "energy", "stimulation", "fear_level"]
+AGENT_FLOATS = ["x", "y", "radius"] + AGENT_VITALS
+
+Point = namedtuple("Point", "x y")
+
+
+def _delta_width(delta):
+    """Byte width of the narrowest of int8/int16/int32 that holds every value of `delta`."""
+    if not delta.size:
+        return 1
+    largest = max(-int(delta.min()), int(delta.max()))
+    return 1 if largest < 128 else 2 if largest < 32768 else 4
+
+
+class ReplayRecorder:
+    """
+    Record the positions of every prey, predator and agent frame by frame.
+
+    Frames are gathered into chunks of `keyframe_interval`. The first frame
+    of a chunk is a keyframe holding absolute quarter-pixel positions; each
+    later frame only stores which entities died, the newborns, and each
+    survivor's movement since the previous frame, which nearly always fits
+    in a byte. A finished chunk is zlib-compressed and appended to the file,
+    so memory stays flat however long the run. On `close()` a seek index of
+    chunk offsets is appended; a file left without one (a crashed run) is
+    re-indexed by scanning its chunks.
+
+    Attach a recorder as `world.recorder` and World.step() records each frame.
+    """
+
+    def __init__(self, path=REPLAY_FILE, keyframe_interval=KEYFRAME_INTERVAL, meta=None):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.meta = dict(meta or {})
+        self.frames = 0
+        self.chunks = []  # [first frame index, frames, file offset]
+        self._file = open(path, "wb")
+        self._file.write(FILE_HEADER.pack(MAGIC, FORMAT))
+        self._parts = []
+        self._chunk_frames = 0
+        self._previous = {}
+        self._labels = {"emotions": {}, "actions": {}}
+
+    def _code(self, kind, labels):
+        codes = self._labels[kind]
+        return np.array([codes.setdefault(label, len(codes)) for label in labels.tolist()], dtype=np.uint8)
+
+    def _population(self, name, population, keyframe):
+        ids = population.id.astype(np.uint32)
+        # (2, n): x and y in quarter pixels
+        q = np.rint(np.stack((population.x, population.y)) * QUANT).astype(np.int32)
+        radius = population.radius.astype(np.uint8)
+        previous = self._previous.get(name)
+        self._previous[name] = (ids, q)
+        parts = self._parts
+
+        if keyframe or previous is None:
+            parts += [POP_KEY.pack(KEY, len(ids)), ids.tobytes(), q.astype(np.uint16).tobytes(), radius.tobytes()]
+            return
+
+        # Ids only grow and rows keep their order, so this frame's entities are
+        # the survivors of the previous frame (in order) followed by newborns
+        prev_ids, prev_q = previous
+        kept = int(np.searchsorted(ids, prev_ids[-1], side="right")) if len(prev_ids) else 0
+        if kept == len(prev_ids):
+            alive = np.ones(kept, dtype=bool)
+            delta = q[:, :kept] - prev_q
+        else:
+            alive = np.zeros(len(prev_ids), dtype=bool)
+            alive[np.searchsorted(prev_ids, ids[:kept])] = True
+            delta = q[:, :kept] - prev_q[:, alive]
+        width = _delta_width(delta)
+        parts += [POP_DELTA.pack(DELTA, len(ids) - kept, width), np.packbits(alive).tobytes(),
+                  delta.astype(DELTA_TYPES[width]).tobytes(),
+                  ids[kept:].tobytes(), q[:, kept:].astype(np.uint16).tobytes(), radius[kept:].tobytes()]
+
+    def record(self, world):
+        keyframe = self._chunk_frames == 0
+        self._parts.append(FRAME.pack(world.frame))
+        self._population("prey", world.prey, keyframe)
+        self._population("predators", world.predators, keyframe)
+        self._parts.append(world.predators.target_id.astype(np.int32).tobytes())
+
+        agents = world.agents
+        self._parts += [
+            AGENT_COUNT.pack(len(agents)),
+            np.stack([getattr(agents, name) for name in AGENT_FLOATS]).astype(np.float32).tobytes(),
+            self._code("emotions", agents.emotion).tobytes(),
+            self._code("actions", agents.action).tobytes(),
+            agents.target_kind.astype(np.int8).tobytes(),
+            agents.target_id.astype(np.int32).tobytes(),
+        ]
+
+        self.frames += 1
+        self._chunk_frames += 1
+        if self._chunk_frames >= self.keyframe_interval:
+            self._write_chunk()
+
+    def _write_chunk(self):
+        if not self._chunk_frames:
+            return
+        # Labels go in every chunk so each chunk decodes on its own
+        labels = json.dumps({kind: list(codes) for kind, codes in self._labels.items()}).encode()
+        raw = b"".join([struct.pack("<I", len(labels)), labels] + self._parts)
+        data = zlib.compress(raw, 6)
+        first = self.frames - self._chunk_frames
+        self.chunks.append([first, self._chunk_frames, self._file.tell()])
+        self._file.write(CHUNK_HEADER.pack(first, self._chunk_frames, len(raw), len(data)))
+        self._file.write(data)
+        self._file.flush()
+        self._parts = []
+        self._chunk_frames = 0
+
+    def close(self):
+        self._write_chunk()
+        index = json.dumps({
+            "frames": self.frames,
+            "keyframe_interval": self.keyframe_interval,
+            "quant": QUANT,
+            "screen": [SCREEN_WIDTH, SCREEN_HEIGHT],
+            "chunks": self.chunks,
+            "meta": self.meta,
+        }).encode()
+        offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(FOOTER.pack(offset, INDEX_MAGIC))
+        self._file.close()
+        return os.path.getsize(self.path)
+
+
+class ReplayPopulation:
+    """One population of one replay frame: the columns the renderer reads."""
+
+    def __init__(self, ids, x, y, radius, **columns):
+        self.id = ids
+        self.x = x
+        self.y = y
+        self.radius = radius
+        for name, column in columns.items():
+            setattr(self, name, column)
+
+    def __len__(self):
+        return len(self.id)
+
+    def position_of(self, entity_id):
+        row = int(np.searchsorted(self.id, entity_id))
+        if row < len(self.id) and self.id[row] == entity_id:
+            return Point(float(self.x[row]), float(self.y[row]))
+        return None
+
+
+class ReplayAgent:
+    """The followed agent of a replay frame, with the attributes the HUD reads."""
+
+    def __init__(self, frame, row=0):
+        agents = frame.agents
+        self.x = float(agents.x[row])
+        self.y = float(agents.y[row])
+        self.radius = float(agents.radius[row])
+        for name in AGENT_VITALS:
+            setattr(self, name, float(getattr(agents, name)[row]))
+        self.emotion = str(agents.emotion[row])
+        self.action = str(agents.action[row])
+        population = {PREY_TARGET: frame.prey, PREDATOR_TARGET: frame.predators}.get(int(agents.target_kind[row]))
+        self.current_target = population.position_of(agents.target_id[row]) if population else None
+
+    @property
+    def colour(self):
+        return EMOTION_COLOURS.get(self.emotion, TURTLE_COLOUR)
+
+    # Drawn exactly like a live agent
+    draw = Agent.draw
+
+
+class ReplayFrame:
+    def __init__(self, frame, prey, predators, agents):
+        self.frame = frame
+        self.prey = prey
+        self.predators = predators
+        self.agents = agents
+        self.agent = ReplayAgent(self)
+
+    def target_lines(self):
+        """(predator, prey) position pairs for every chasing predator."""
+        lines = []
+        for x, y, target_id in zip(self.predators.x, self.predators.y, self.predators.target_id):
+            target = self.prey.position_of(target_id) if target_id >= 0 else None
+            if target:
+                lines.append(((int(x), int(y)), (int(target.x), int(target.y))))
+        return lines
+
+
+class _Cursor:
+    """Sequential reader of structs and arrays from a decoded chunk."""
+
+    def __init__(self, data, offset=0):
+        self.data = data
+        self.offset = offset
+
+    def struct(self, layout):
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def array(self, dtype, count):
+        values = np.frombuffer(self.data, dtype=dtype, count=count, offset=self.offset)
+        self.offset += values.nbytes
+        return values
+
+
+class ReplayReader:
+    """
+    Random access to a recording: `reader[i]` is the i-th recorded frame as
+    a ReplayFrame. Seeking decodes at most one chunk (from its keyframe),
+    and the most recently decoded chunk is kept, so playing forwards or
+    backwards within a chunk costs nothing.
+    """
+
+    def __init__(self, path=REPLAY_FILE):
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = f.read()
+        magic, version = FILE_HEADER.unpack_from(self._data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a replay")
+        if version > FORMAT:
+            raise ValueError(f"replay format {version} is newer than this code ({FORMAT})")
+        self.index = self._read_index()
+        self.meta = self.index.get("meta", {})
+        self._starts = [chunk[0] for chunk in self.index["chunks"]]
+        self._cached = (None, [])
+
+    def _read_index(self):
+        if len(self._data) >= FILE_HEADER.size + FOOTER.size:
+            offset, magic = FOOTER.unpack_from(self._data, len(self._data) - FOOTER.size)
+            if magic == INDEX_MAGIC:
+                return json.loads(self._data[offset:len(self._data) - FOOTER.size])
+        return self._scan()
+
+    def _scan(self):
+        """Rebuild the index of a recording that was never closed, stopping at a torn chunk."""
+        chunks, offset = [], FILE_HEADER.size
+        while offset + CHUNK_HEADER.size <= len(self._data):
+            first, frames, _, size = CHUNK_HEADER.unpack_from(self._data, offset)
+            if offset + CHUNK_HEADER.size + size > len(self._data):
+                break
+            chunks.append([first, frames, offset])
+            offset += CHUNK_HEADER.size + size
+        frames = chunks[-1][0] + chunks[-1][1] if chunks else 0
+        return {"frames": frames, "quant": QUANT, "chunks": chunks, "meta": {}}
+
+    def __len__(self):
+        return self.index["frames"]
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self):
+            raise IndexError("replay frame out of range")
+        chunk = bisect_right(self._starts, i) - 1
+        if self._cached[0] != chunk:
+            self._cached = (chunk, self._decode(chunk))
+        return self._cached[1][i - self._starts[chunk]]
+
+    def _decode(self, chunk):
+        _, frames, offset = self.index["chunks"][chunk]
+        _, _, _, size = CHUNK_HEADER.unpack_from(self._data, offset)
+        start = offset + CHUNK_HEADER.size
+        raw = zlib.decompress(self._data[start:start + size])
+        cursor = _Cursor(raw)
+        (label_size,) = cursor.struct(struct.Struct("<I"))
+        labels = json.loads(raw[cursor.offset:cursor.offset + label_size])
+        cursor.offset += label_size
+        emotions = np.array(labels["emotions"] or [""])
+        actions = np.array(labels["actions"] or [""])
+        quant = self.index["quant"]
+
+        decoded, previous = [], {}
+        for _ in range(frames):
+            (frame,) = cursor.struct(FRAME)
+            prey = self._population(cursor, previous, "prey", quant)
+            predators = self._population(cursor, previous, "predators", quant)
+            predators.target_id = cursor.array(np.int32, len(predators))
+
+            (n,) = cursor.struct(AGENT_COUNT)
+            values = dict(zip(AGENT_FLOATS, cursor.array(np.float32, n * len(AGENT_FLOATS)).reshape(-1, n)))
+            agents = ReplayPopulation(
+                np.arange(n), values.pop("x"), values.pop("y"), values.pop("radius"),
+                emotion=emotions[cursor.array(np.uint8, n)],
+                action=actions[cursor.array(np.uint8, n)],
+                target_kind=cursor.array(np.int8, n),
+                target_id=cursor.array(np.int32, n),
+                **values,
+            )
+            decoded.append(ReplayFrame(frame, prey, predators, agents))
+        return decoded
+
+    @staticmethod
+    def _population(cursor, previous, name, quant):
+        (kind,) = struct.unpack_from("<B", cursor.data, cursor.offset)
+        if kind == KEY:
+            _, n = cursor.struct(POP_KEY)
+            ids = cursor.array(np.uint32, n)
+            q = cursor.array(np.uint16, 2 * n).reshape(2, n).astype(np.int32)
+            radius = cursor.array(np.uint8, n)
+        else:
+            _, born, width = cursor.struct(POP_DELTA)
+            prev_ids, prev_q, prev_radius = previous[name]
+            alive = np.unpackbits(cursor.array(np.uint8, -(-len(prev_ids) // 8)), count=len(prev_ids)).astype(bool)
+            kept = int(alive.sum())
+            delta = cursor.array(DELTA_TYPES[width], 2 * kept).reshape(2, kept)
+            ids = np.concatenate([prev_ids[alive], cursor.array(np.uint32, born)])
+            q = np.concatenate([prev_q[:, alive] + delta, cursor.array(np.uint16, 2 * born).reshape(2, born)], axis=1)
+            radius = np.concatenate([prev_radius[alive], cursor.array(np.uint8, born)])
+        previous[name] = (ids, q, radius)
+        return ReplayPopulation(ids.astype(np.int64), q[0] / quant, q[1] / quant, radius.astype(float))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Describe a replay recording.")
+    parser.add_argument("path", nargs="?", default=REPLAY_FILE)
+    args = parser.parse_args()
+
+    reader = ReplayReader(args.path)
+    size = os.path.getsize(args.path)
+    print(f"🎞️ {args.path}: {len(reader)} frames in {len(reader.index['chunks'])} chunks, "
+          f"{size / 1024:.0f} KiB ({size / max(len(reader), 1):.0f} bytes/frame)")
+    if len(reader):
+        first, last = reader[0], reader[len(reader) - 1]
+        print(f"   frames {first.frame}-{last.frame}, final prey: {len(last.prey)}, agent: {last.agent.emotion}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# rollout.py
+
+import os
+import json
+import time
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from settings import INITIAL_PREY, INITIAL_PREDATORS
+from model_registry import MODELS_DIR, MODEL_FILENAME, list_versions, save_rollout, ROLLOUT_FILENAME
+
+DEFAULT_WORLDS = 32
+DEFAULT_FRAMES = 5000
+
+
+class RolloutStats:
+    """Stands in for an agent log writer, keeping only the totals a rollout reports."""
+
+    def __init__(self):
+        self.reward = 0.0
+        self.emotions = Counter()
+
+    def write(self, entry):
+        self.reward += entry["reward"]
+        self.emotions[entry["emotion"]] += 1
+
+
+def run_rollout(model_path, seed, frames=DEFAULT_FRAMES, num_prey=INITIAL_PREY, num_predators=INITIAL_PREDATORS,
+                snapshot=None):
+    """
+    Run one seeded headless world with `model_path` as the policy until the
+    agent dies or `frames` pass. `model_path` None uses the fallback rules.
+    With `snapshot` (bytes from snapshot.snapshot) the world starts from
+    that moment instead, reseeded with `seed`.
+    """
+    from policy_engine import registry
+    from world import World
+
+    registry.set_active(model_path)
+    if snapshot is not None:
+        import snapshot as snapshots
+        world = snapshots.reseed(snapshots.restore(snapshot), seed)
+    else:
+        world = World(num_prey=num_prey, num_predators=num_predators, seed=seed)
+    stats = RolloutStats()
+    world.agents.log_writer = stats
+
+    started = time.perf_counter()
+    agents = world.agents
+    start_frame = world.frame
+    while world.frame - start_frame < frames and agents.health[0] > 0:
+        world.step()
+
+    return {
+        "model": model_path,
+        "seed": seed,
+        "survival_frames": world.frame - start_frame,
+        "survived": bool(agents.health[0] > 0),
+        "reward": stats.reward,
+        "food_eaten": int(agents.food_eaten[0]),
+        "emotion_frames": dict(stats.emotions),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def _summary(values):
+    values = np.asarray(values, dtype=float)
+    return {
+        "mean": float(values.mean()),
+        "median": float(np.median(values)),
+        "std": float(values.std()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+    }
+
+
+def aggregate(results, frames):
+    """Summary of one model's rollouts, as stored in its models/vN/rollout.json."""
+    emotion_frames = Counter()
+    for r in results:
+        emotion_frames.update(r["emotion_frames"])
+    total = sum(emotion_frames.values()) or 1
+    return {
+        "worlds": len(results),
+        "seeds": sorted(r["seed"] for r in results),
+        "max_frames": frames,
+        "survival_frames": _summary([r["survival_frames"] for r in results]),
+        "survival_rate": float(np.mean([r["survived"] for r in results])),
+        "reward": _summary([r["reward"] for r in results]),
+        "food_eaten": _summary([r["food_eaten"] for r in results]),
+        "time_in_emotion": {emotion: count / total for emotion, count in sorted(emotion_frames.items())},
+    }
+
+
+def resolve_models(targets, models_dir=MODELS_DIR):
+    """Model paths for a mix of pkl paths and version names; "all" means every registered version."""
+    paths = []
+    for target in targets:
+        if target == "all":
+            paths.extend(entry["artifacts"][MODEL_FILENAME]["path"] for entry in list_versions(models_dir)
+                         if MODEL_FILENAME in entry["artifacts"])
+        elif os.path.isdir(os.path.join(models_dir, target)):
+            paths.append(os.path.join(models_dir, target, MODEL_FILENAME))
+        else:
+            paths.append(target)
+    return list(dict.fromkeys(paths))
+
+
+def run_farm(model_paths, worlds=DEFAULT_WORLDS, frames=DEFAULT_FRAMES, seed=0, workers=None, on_result=None, **world_args):
+    """
+    Roll out every model in `worlds` seeded worlds (seeds seed..seed+worlds-1,
+    the same for every model) across a process pool of `workers` (default:
+    all cores). Results are handed to `on_result` as each world finishes.
+    Returns {model_path: aggregate}.
+    """
+    results = {path: [] for path in model_paths}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(run_rollout, path, seed + i, frames, **world_args)
+            for i in range(worlds) for path in model_paths
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results[result["model"]].append(result)
+            if on_result:
+                on_result(result, done, len(futures))
+    return {path: aggregate(model_results, frames) for path, model_results in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate policy models by rolling them out in seeded headless worlds.")
+    parser.add_argument("models", nargs="+", help="policy_model.pkl paths, version names (v11) or 'all'")
+    parser.add_argument("--worlds", type=int, default=DEFAULT_WORLDS, help="seeded worlds per model")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help="frame limit per world")
+    parser.add_argument("--seed", type=int, default=0, help="first world seed")
+    parser.add_argument("--prey", type=int, default=INITIAL_PREY, help="initial prey count")
+    parser.add_argument("--predators", type=int, default=INITIAL_PREDATORS, help="predator count")
+    parser.add_argument("--snapshot", default=None, help="start every world from this snapshot (world.py --save-snapshot)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--output", default=None, help="also stream every rollout to this JSON Lines file")
+    parser.add_argument("--no-save", action="store_true", help=f"don't write the aggregates to models/vN/{ROLLOUT_FILENAME}")
+    args = parser.parse_args()
+
+    model_paths = resolve_models(args.models)
+    world_args = {"num_prey": args.prey, "num_predators": args.predators}
+    if args.snapshot:
+        with open(args.snapshot, "rb") as f:
+            world_args["snapshot"] = f.read()
+    stream = open(args.output, "a") if args.output else None
+
+    def on_result(result, done, total):
+        print(f"🎲 [{done}/{total}] {result['model']} seed={result['seed']}: "
+              f"survived {result['survival_frames']} frames, reward {result['reward']:.1f}, "
+              f"ate {result['food_eaten']} ({result['seconds']:.1f}s)")
+        if stream:
+            stream.write(json.dumps(result) + "\n")
+            stream.flush()
+
+    started = time.perf_counter()
+    try:
+        summaries = run_farm(model_paths, args.worlds, args.frames, args.seed, args.workers, on_result, **world_args)
+    finally:
+        if stream:
+            stream.close()
+    print(f"⏱️ {len(model_paths) * args.worlds} rollouts in {time.perf_counter() - started:.1f}s")
+
+    for path, summary in summaries.items():
+        print(f"🏁 {path}: survival {summary['survival_frames']['mean']:.0f} ± {summary['survival_frames']['std']:.0f} "
+              f"frames, reward {summary['reward']['mean']:.1f}, food {summary['food_eaten']['mean']:.1f}")
+        version = os.path.basename(os.path.dirname(path))
+        # Rollouts from a snapshot measure something else than the standard benchmark
+        if not args.no_save and not args.snapshot and os.path.exists(os.path.join(MODELS_DIR, version, "config.json")):
+            save_rollout(version, summary)
+            print(f"📝 Saved rollout results to {os.path.join(MODELS_DIR, version, ROLLOUT_FILENAME)}")
+
+
+if __name__ == "__main__":
+    main()
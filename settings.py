@@ -23,3 +23,29 @@ EMOTION_COLOURS = {
     "Exhausted": (150, 0, 255),
     "Bored": (180, 180, 0)
 }
+
+# World population
+INITIAL_PREY = 20
+INITIAL_PREDATORS = 3
+MAX_PREY = 100               # breeding stops at this population
+PREY_SPAWN_CHANCE = 0.01     # chance per frame of a new prey wandering in
+MAX_SPAWNED_PREY = 50        # random spawns stop above this population
+
+# Spatial grid used for proximity queries (pixels per cell)
+GRID_CELL_SIZE = 80
+
+# Agent log entries kept in memory (the streaming log on disk keeps everything)
+LOG_RETAIN_ROWS = 10000
+# main.py starts a new agent_log.N.jsonl segment once the log reaches this size
+LOG_ROTATE_MB = 64
+
+# Live telemetry: the simulation sends per-frame aggregates over UDP to the
+# dashboard server, which keeps the most recent ones in a ring buffer
+TELEMETRY_HOST = "127.0.0.1"
+TELEMETRY_PORT = 5005
+TELEMETRY_SEND_HZ = 20       # datagrams per second from the simulation
+TELEMETRY_MAX_BATCH = 50     # samples per datagram; faster runs are downsampled
+TELEMETRY_BUFFER = 20000     # samples kept by the server
+
+# Simulation seed: an int makes every run repeat exactly, None varies each run
+SEED = None
@@ -0,0 +1,117 @@
+# spatial.py
+
+import math
+import numpy as np
+from settings import *
+
+
+# Below this many (a, b) pairs, comparing every pair with NumPy beats
+# building a grid and querying it one entity at a time
+DIRECT_PAIRS = 4096
+
+
+def pairwise_distances(ax, ay, bx, by):
+    """(len(a), len(b)) array of distances between every point of a and b."""
+    return np.hypot(ax[:, None] - bx, ay[:, None] - by)
+
+
+def positions_of(entities):
+    """Stack the (x, y) of a list of entities into an (N, 2) float array."""
+    if hasattr(entities, "positions"):
+        return entities.positions()
+    if not entities:
+        return np.empty((0, 2))
+    return np.array([(e.x, e.y) for e in entities], dtype=float)
+
+
+class SpatialGrid:
+    """
+    Uniform grid over the screen for radius and nearest-neighbour queries.
+
+    Entities are bucketed by cell and stored sorted by cell id, so every
+    row of cells touched by a query is one contiguous slice. Queries return
+    indices into the positions passed to `build`, and only look at cells
+    overlapping the search circle, so cost follows local density instead
+    of population size.
+    """
+
+    def __init__(self, cell_size=GRID_CELL_SIZE, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        self.cell_size = cell_size
+        self.cols = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
+        self.build(np.empty((0, 2)))
+
+    def __len__(self):
+        return len(self.xs)
+
+    def build(self, positions, radii=None):
+        """Re-bucket all entities. `radii` is only needed for `query_contacts`."""
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        self.xs = positions[:, 0]
+        self.ys = positions[:, 1]
+        self.radii = np.zeros(len(positions)) if radii is None else np.asarray(radii, dtype=float)
+        self.max_radius = float(self.radii.max()) if len(self.radii) else 0.0
+
+        cols = np.clip((self.xs // self.cell_size).astype(int), 0, self.cols - 1)
+        rows = np.clip((self.ys // self.cell_size).astype(int), 0, self.rows - 1)
+        cells = rows * self.cols + cols
+        if self.rows * self.cols < 2 ** 15:
+            cells = cells.astype(np.int16)  # stable sort of 16-bit ints is a radix sort
+        self._order = np.argsort(cells, kind="stable")
+        counts = np.bincount(cells, minlength=self.rows * self.cols)
+        self._starts = np.concatenate(([0], np.cumsum(counts)))
+        return self
+
+    def build_from(self, entities):
+        """Build from a Population, or any sequence of objects with x, y and radius."""
+        if hasattr(entities, "positions"):
+            return self.build(entities.positions(), entities.radius)
+        radii = [e.radius for e in entities]
+        return self.build(positions_of(entities), radii)
+
+    def _candidates(self, x, y, r):
+        col0 = min(max(int((x - r) // self.cell_size), 0), self.cols - 1)
+        col1 = min(max(int((x + r) // self.cell_size), 0), self.cols - 1)
+        row0 = min(max(int((y - r) // self.cell_size), 0), self.rows - 1)
+        row1 = min(max(int((y + r) // self.cell_size), 0), self.rows - 1)
+
+        slices = [
+            self._order[self._starts[row * self.cols + col0]:self._starts[row * self.cols + col1 + 1]]
+            for row in range(row0, row1 + 1)
+        ]
+        return slices[0] if len(slices) == 1 else np.concatenate(slices)
+
+    def query_radius(self, x, y, r):
+        """Return (indices, distances) of entities within distance `r` of (x, y)."""
+        if not len(self.xs):
+            return np.empty(0, dtype=int), np.empty(0)
+        idx = self._candidates(x, y, r)
+        dist = np.hypot(self.xs[idx] - x, self.ys[idx] - y)
+        keep = dist <= r
+        return idx[keep], dist[keep]
+
+    def query_contacts(self, x, y, radius):
+        """Indices of entities whose circle overlaps a circle of `radius` at (x, y)."""
+        idx, dist = self.query_radius(x, y, radius + self.max_radius)
+        return idx[dist < radius + self.radii[idx]]
+
+    def nearest(self, x, y, mask=None):
+        """
+        Return (index, distance) of the closest entity to (x, y), optionally
+        restricted to entities where `mask` is True, or (-1, inf) if none.
+        """
+        if not len(self.xs):
+            return -1, float("inf")
+        r = self.cell_size
+        limit = math.hypot(self.cols, self.rows) * self.cell_size
+        while True:
+            idx, dist = self.query_radius(x, y, r)
+            if mask is not None:
+                keep = mask[idx]
+                idx, dist = idx[keep], dist[keep]
+            if len(idx):
+                best = int(np.argmin(dist))
+                return int(idx[best]), float(dist[best])
+            if r > limit:
+                return -1, float("inf")
+            r *= 2
@@ -0,0 +1,107 @@
+# sweep.py
+
+import os
+import json
+import time
+import shutil
+import itertools
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+from sklearn.metrics import f1_score
+
+MODEL_TYPES = {
+    "DecisionTree": DecisionTreeClassifier,
+    "RandomForest": RandomForestClassifier,
+    "ExtraTrees": ExtraTreesClassifier,
+}
+
+DEFAULT_GRID = {
+    "model_type": ["DecisionTree"],
+    "max_depth": [3, 5, 8, 12],
+    "min_samples_leaf": [1, 5, 20],
+    "class_weight": [None, "balanced"],
+}
+
+
+def expand_grid(grid):
+    """Every combination of the grid's values, as a list of parameter dicts."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def build_model(params, random_seed):
+    """Instantiate the classifier described by a sweep parameter dict."""
+    params = dict(params)
+    model_class = MODEL_TYPES[params.pop("model_type", "DecisionTree")]
+    if model_class is not DecisionTreeClassifier:
+        params.setdefault("n_jobs", 1)  # the sweep already uses every core
+    return model_class(random_state=random_seed, **params)
+
+
+# Split arrays, memory-mapped once per worker process
+_data = {}
+
+
+def _init_worker(data_dir):
+    for name in ("X_train", "X_test", "y_train", "y_test"):
+        _data[name] = np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode="r")
+
+
+def _evaluate(params, random_seed):
+    model = build_model(params, random_seed)
+
+    started = time.perf_counter()
+    model.fit(_data["X_train"], _data["y_train"])
+    fit_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    y_pred = model.predict(_data["X_test"])
+    predict_seconds = time.perf_counter() - started
+
+    return {
+        "params": params,
+        "f1_macro": float(f1_score(_data["y_test"], y_pred, average="macro")),
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+    }
+
+
+def run_sweep(X_train, X_test, y_train, y_test, grid=None, random_seed=42, workers=None):
+    """
+    Fit and score every candidate in `grid` across a process pool.
+
+    The split is written once to .npy files that each worker memory-maps,
+    so candidates share one copy of the data instead of re-loading the log.
+    Returns the results sorted best first: highest f1_macro, then fastest
+    predict.
+    """
+    candidates = expand_grid(grid or DEFAULT_GRID)
+    data_dir = tempfile.mkdtemp(prefix="sweep-")
+    try:
+        for name, array in (("X_train", X_train), ("X_test", X_test), ("y_train", y_train), ("y_test", y_test)):
+            np.save(os.path.join(data_dir, f"{name}.npy"), np.asarray(array))
+
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_dir,)) as pool:
+            futures = [pool.submit(_evaluate, params, random_seed) for params in candidates]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                print(f"🔎 [{len(results)}/{len(candidates)}] f1={result['f1_macro']:.3f} "
+                      f"fit={result['fit_seconds'] * 1000:.0f}ms {json.dumps(result['params'])}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    results.sort(key=lambda r: (-r["f1_macro"], r["predict_seconds"]))
+    return results
+
+
+def load_grid(text):
+    """Read a grid from a JSON string or a path to a JSON file."""
+    if os.path.exists(text):
+        with open(text, "r") as f:
+            return json.load(f)
+    return json.loads(text)
@@ -0,0 +1,131 @@
+# telemetry.py
+
+import json
+import time
+import socket
+import threading
+from collections import deque
+from itertools import islice
+from settings import TELEMETRY_HOST, TELEMETRY_PORT, TELEMETRY_SEND_HZ, TELEMETRY_MAX_BATCH, TELEMETRY_BUFFER
+
+VITALS = ["hunger", "energy", "health", "stimulation", "fear_level"]
+
+
+def frame_sample(world, step_seconds):
+    """Aggregate of one simulation frame: the followed agent, mean vitals and population counts."""
+    agents = world.agents
+    sample = {
+        "frame": world.frame,
+        "time": time.time(),
+        "step_ms": round(step_seconds * 1000, 3),
+        "emotion": str(agents.emotion[0]),
+        "action": str(agents.action[0]),
+        "agents": len(agents),
+        "prey": len(world.prey),
+        "predators": len(world.predators),
+    }
+    for name in VITALS:
+        sample[name] = round(float(getattr(agents, name).mean()), 2)
+    return sample
+
+
+def downsample(samples, max_points):
+    """Every k-th sample so at most `max_points` remain, always keeping the newest."""
+    if not max_points or len(samples) <= max_points:
+        return list(samples)
+    stride = -(-len(samples) // max_points)
+    return list(samples)[len(samples) - 1::-stride][::-1]
+
+
+class TelemetryPublisher:
+    """
+    Send frame samples from a running simulation as UDP datagrams.
+
+    Samples are batched and sent at most `send_hz` times per second, and a
+    batch is downsampled to `max_batch` samples, so a fast headless run
+    costs a handful of sends per second. UDP never blocks the simulation:
+    with no dashboard listening, datagrams are simply dropped.
+    """
+
+    def __init__(self, host=TELEMETRY_HOST, port=TELEMETRY_PORT, send_hz=TELEMETRY_SEND_HZ, max_batch=TELEMETRY_MAX_BATCH):
+        self.address = (host, port)
+        self.interval = 1.0 / send_hz
+        self.max_batch = max_batch
+        self.dropped = 0
+        self._pending = []
+        self._last_send = time.perf_counter()
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+    def publish(self, sample):
+        self._pending.append(sample)
+        if time.perf_counter() - self._last_send >= self.interval:
+            self.flush()
+
+    def flush(self):
+        self._last_send = time.perf_counter()
+        if not self._pending:
+            return
+        batch, self._pending = downsample(self._pending, self.max_batch), []
+        try:
+            self._socket.sendto(json.dumps(batch).encode(), self.address)
+        except OSError:
+            self.dropped += len(batch)
+
+    def close(self):
+        self.flush()
+        self._socket.close()
+
+
+class TelemetryBuffer:
+    """
+    Thread-safe ring buffer of the most recent `capacity` samples.
+
+    Every sample gets an increasing sequence number, so readers ask for
+    what arrived after the last sequence they saw and can block until
+    something does.
+    """
+
+    def __init__(self, capacity=TELEMETRY_BUFFER):
+        self._samples = deque(maxlen=capacity)
+        self.seq = 0
+        self._changed = threading.Condition()
+
+    def extend(self, samples):
+        with self._changed:
+            for sample in samples:
+                self._samples.append(sample)
+                self.seq += 1
+            self._changed.notify_all()
+
+    def since(self, seq=0, max_points=None):
+        """(latest seq, samples newer than `seq`, downsampled to `max_points`)."""
+        with self._changed:
+            latest = self.seq
+            # Sequence numbers are consecutive, so the newest `count` samples are the new ones
+            count = min(max(latest - seq, 0), len(self._samples))
+            newer = list(islice(reversed(self._samples), count))[::-1]
+        return latest, downsample(newer, max_points)
+
+    def wait(self, seq, timeout=None):
+        """Block until a sample newer than `seq` arrives. Returns False on timeout."""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.seq > seq, timeout)
+
+
+class TelemetryReceiver(threading.Thread):
+    """Daemon thread feeding datagrams from TelemetryPublisher into a TelemetryBuffer."""
+
+    def __init__(self, buffer, host=TELEMETRY_HOST, port=TELEMETRY_PORT):
+        super().__init__(daemon=True)
+        self.buffer = buffer
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((host, port))
+
+    def run(self):
+        while True:
+            data, _ = self._socket.recvfrom(65536)
+            try:
+                self.buffer.extend(json.loads(data))
+            except ValueError:
+                continue
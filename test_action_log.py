@@ -0,0 +1,57 @@
+import json
+from action_log import ActionLogWriter, is_session_header, read_log
+from log_loader import iter_entries, load_dataset
+from world import World
+
+ENTRY = {"frame": 1, "state": {"hunger": 1, "energy": 2, "health": 3, "stimulation": 4, "fear_level": 5},
+         "emotion": "Idle", "action": "idle", "reward": 0.0}
+
+
+def _lines(path):
+    return [json.loads(line) for line in open(path)]
+
+
+def test_each_run_starts_with_a_session_header(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    sessions = []
+    for _ in range(2):
+        with ActionLogWriter(path) as writer:
+            writer.write(ENTRY)
+            sessions.append(writer.session)
+
+    lines = _lines(path)
+    assert [line.get("session") for line in lines] == [sessions[0], None, sessions[1], None]
+    assert sessions[0] != sessions[1]
+    assert read_log(path) == list(iter_entries(path)) == [ENTRY, ENTRY]
+    assert len(load_dataset(path)[0]) == 2
+
+
+def test_rotated_segments_carry_the_session(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    with ActionLogWriter(path, flush_every=1, max_frames=2) as writer:
+        for _ in range(3):
+            writer.write(ENTRY)
+    first, current = _lines(str(tmp_path / "log.1.jsonl")), _lines(path)
+    assert is_session_header(first[0]) and is_session_header(current[0])
+    assert first[0]["session"] == current[0]["session"]
+    assert (first[0]["segment"], current[0]["segment"]) == (0, 1)
+    assert writer.rows_written == 3
+
+
+def test_save_action_log_keeps_a_full_log_over_a_truncated_tail(registry, tmp_path, monkeypatch):
+    world = World(seed=0)
+    monkeypatch.setattr(world.agents, "action_log", type(world.agents.action_log)(maxlen=50))
+    path = tmp_path / "agent_log.json"
+    for _ in range(20):
+        world.step()
+    assert world.agent.save_action_log(str(path)) == str(path)
+    assert len(json.loads(path.read_text())) == 20
+
+    for _ in range(100):
+        world.step()
+    assert world.agent.save_action_log(str(path)) is None
+    assert len(json.loads(path.read_text())) == 20
+
+    path.unlink()
+    assert world.agent.save_action_log(str(path)) == str(path)
+    assert len(json.loads(path.read_text())) == 50
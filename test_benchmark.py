@@ -0,0 +1,19 @@
+from benchmark import compare, machine_mismatches
+
+
+def _results(**seconds):
+    return {"results": {name: {"seconds": s} for name, s in seconds.items()}}
+
+
+def test_sub_millisecond_results_use_the_wider_threshold():
+    baseline = _results(fast=0.0004, slow=0.5)
+    assert compare(_results(fast=0.0006, slow=0.6)["results"], baseline) == []
+    assert compare(_results(fast=0.0009, slow=0.7)["results"], baseline) == [("fast", 0.0004, 0.0009),
+                                                                             ("slow", 0.5, 0.7)]
+    assert compare(_results(fast=0.0006)["results"], baseline, min_seconds=0) == [("fast", 0.0004, 0.0006)]
+
+
+def test_machine_mismatches():
+    meta = {"machine": "x86_64", "processor": "", "cpus": 8, "python": "3.12"}
+    assert machine_mismatches(meta, {**meta, "python": "3.11"}) == []
+    assert machine_mismatches(meta, {**meta, "cpus": 1}) == [("cpus", 1, 8)]
@@ -0,0 +1,68 @@
+import numpy as np
+from columnar_log import ColumnarLogWriter, FEATURE_NAMES, load_columnar, convert
+
+
+def _entries(n=250, seed=0):
+    rng = np.random.default_rng(seed)
+    emotions = ["Idle", "Hungry", "Fearful", "Bored"]
+    actions = ["idle", "seek_food", "flee", "rest", "wander"]
+    return [
+        {
+            "frame": i,
+            "state": {name: float(np.float32(rng.uniform(0, 100))) for name in FEATURE_NAMES},
+            "emotion": emotions[rng.integers(len(emotions))],
+            "action": actions[rng.integers(len(actions))],
+            "reward": float(rng.choice([-1.5, -1, -0.5, 0, 1])),
+            "agent": int(rng.integers(3)),
+        }
+        for i in range(n)
+    ]
+
+
+def _assert_round_trip(columns, entries):
+    assert columns["frame"].tolist() == [e["frame"] for e in entries]
+    assert columns["state"].tolist() == [[e["state"][name] for name in FEATURE_NAMES] for e in entries]
+    assert columns["emotion_labels"].tolist() == [e["emotion"] for e in entries]
+    assert columns["action_labels"].tolist() == [e["action"] for e in entries]
+    assert columns["reward"].tolist() == [e["reward"] for e in entries]
+    assert columns["agent"].tolist() == [e["agent"] for e in entries]
+
+
+def test_rows_round_trip_across_chunks_and_reopening(tmp_path):
+    path = str(tmp_path / "log.cols")
+    entries = _entries()
+    with ColumnarLogWriter(path, chunk_rows=64) as writer:
+        writer.write_rows(entries[:150])
+    with ColumnarLogWriter(path, chunk_rows=64) as writer:
+        assert writer.rows_written == 150
+        writer.write_rows(entries[150:])
+
+    _assert_round_trip(load_columnar(path), entries)
+    _assert_round_trip(load_columnar(path, mmap=False), entries)
+
+
+def test_write_columns_round_trip(tmp_path):
+    path = str(tmp_path / "log.cols")
+    entries = _entries()
+    with ColumnarLogWriter(path) as writer:
+        writer.write_rows(entries[:100])
+        rest = entries[100:]
+        writer.write_columns(
+            frame=[e["frame"] for e in rest],
+            state=[[e["state"][name] for name in FEATURE_NAMES] for e in rest],
+            emotion=[e["emotion"] for e in rest],
+            action=[e["action"] for e in rest],
+            reward=[e["reward"] for e in rest],
+            agent=[e["agent"] for e in rest],
+        )
+    _assert_round_trip(load_columnar(path), entries)
+
+
+def test_convert_from_json_lines(tmp_path):
+    import json
+
+    entries = _entries()
+    source = tmp_path / "log.jsonl"
+    source.write_text("".join(json.dumps(e) + "\n" for e in entries))
+    _assert_round_trip(load_columnar(convert(str(source), str(tmp_path / "log.cols"))), entries)
+
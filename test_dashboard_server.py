@@ -0,0 +1,27 @@
+import json
+import os
+import pytest
+
+dashboard_server = pytest.importorskip("dashboard_server")
+
+
+def test_versions_api_exposes_rollouts(tmp_path, monkeypatch):
+    from model_registry import MODEL_FILENAME, register_version, save_rollout
+
+    monkeypatch.chdir(tmp_path)
+    for version in ("v1", "v2"):
+        os.makedirs(f"models/{version}")
+        with open(f"models/{version}/config.json", "w") as f:
+            json.dump({"f1_macro": 0.5}, f)
+        with open(f"models/{version}/{MODEL_FILENAME}", "wb") as f:
+            f.write(b"model")
+        register_version(version)
+    summary = {"worlds": 4, "survival_frames": {"mean": 900.0, "std": 10.0}, "reward": {"mean": 1.0}}
+    save_rollout("v1", summary)
+
+    client = dashboard_server.app.test_client()
+    versions = client.get("/api/versions?sort=survival&order=desc").get_json()["versions"]
+    assert [v["version"] for v in versions] == ["v1", "v2"]
+    assert versions[0]["rollout"] == summary and versions[0]["survival_frames"] == 900.0
+    assert versions[1]["rollout"] is None
+    assert client.get(versions[0]["artifacts"]["rollout.json"]).get_json() == summary
@@ -0,0 +1,62 @@
+import numpy as np
+from emotion_engine import evaluate_emotion, evaluate_emotion_batch
+from policy_compiler import CompiledPolicy
+from policy_engine import FEATURE_NAMES, evaluate_policy, evaluate_policy_batch
+
+# Thresholds the rules compare against, and values just either side of them
+EDGES = [-1, 0, 19.9, 20, 20.1, 59.9, 60, 60.1, 69.9, 70, 70.1, 100]
+
+
+def _states(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    state = {name: np.where(rng.random(n) < 0.5, rng.choice(EDGES, n), rng.uniform(0, 100, n))
+             for name in FEATURE_NAMES}
+    context = {
+        "novelty_trigger": rng.random(n) < 0.3,
+        "prey_visible": rng.random(n) < 0.5,
+        "predators_nearby": rng.random(n) < 0.5,
+    }
+    return state, context
+
+
+def _rows(state, context):
+    for i in range(len(state["hunger"])):
+        yield ({name: float(values[i]) for name, values in state.items()},
+               {name: bool(np.broadcast_to(values, state["hunger"].shape)[i]) for name, values in context.items()})
+
+
+def test_emotion_batch_matches_scalar():
+    state, context = _states()
+    batch = evaluate_emotion_batch(state, context)
+    assert batch.tolist() == [evaluate_emotion(s, c) for s, c in _rows(state, context)]
+
+
+def test_policy_batch_matches_scalar_fallback(registry):
+    state, context = _states()
+    context["prey_visible"] = True  # the agents pass a scalar here
+    batch = evaluate_policy_batch(state, context)
+    assert batch.tolist() == [evaluate_policy(s, c) for s, c in _rows(state, context)]
+
+
+def test_policy_batch_matches_scalar_model(registry):
+    from sklearn.tree import DecisionTreeClassifier
+
+    state, context = _states()
+    X = np.column_stack([state[name] for name in FEATURE_NAMES])
+    y = [evaluate_policy(s, c) for s, c in _rows(state, context)]
+    model = DecisionTreeClassifier(max_depth=6, random_state=0).fit(X, y)
+
+    for policy in (model, CompiledPolicy.from_model(model, FEATURE_NAMES)):
+        registry.install("test", policy)
+        batch = evaluate_policy_batch(state, context)
+        assert batch.tolist() == [evaluate_policy(s, c) for s, c in _rows(state, context)]
+        assert batch.tolist() == model.predict(X).tolist()
+
+
+def test_policy_batch_of_no_agents(registry):
+    from sklearn.tree import DecisionTreeClassifier
+
+    model = DecisionTreeClassifier().fit(np.eye(5), ["rest", "idle", "flee", "wander", "idle"])
+    registry.install("test", CompiledPolicy.from_model(model, FEATURE_NAMES))
+    state = {name: np.empty(0) for name in FEATURE_NAMES}
+    assert len(evaluate_policy_batch(state, {"novelty_trigger": np.empty(0, dtype=bool)})) == 0
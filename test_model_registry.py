@@ -0,0 +1,42 @@
+import json
+import os
+from model_registry import MODEL_FILENAME, index_path, latest_model_path, list_versions, load_index, register_version
+
+
+def _version(base_dir, version):
+    os.makedirs(base_dir / version)
+    (base_dir / version / "config.json").write_text(json.dumps({"f1_macro": 0.5}))
+    (base_dir / version / MODEL_FILENAME).write_bytes(b"model")
+
+
+def test_lookups_do_not_write_the_index(tmp_path):
+    _version(tmp_path, "v1")
+    assert [entry["version"] for entry in list_versions(str(tmp_path))] == ["v1"]
+    assert load_index(str(tmp_path))["versions"]["v1"]["metrics"] == {"f1_macro": 0.5}
+    assert not os.path.exists(index_path(str(tmp_path)))
+
+    register_version("v1", str(tmp_path))
+    assert os.path.exists(index_path(str(tmp_path)))
+
+
+def test_discovery_only_sees_registered_versions(tmp_path):
+    _version(tmp_path, "v1")
+    register_version("v1", str(tmp_path))
+    _version(tmp_path, "v2")
+    assert latest_model_path(str(tmp_path)) == str(tmp_path / "v1" / MODEL_FILENAME)
+    register_version("v2", str(tmp_path))
+    assert latest_model_path(str(tmp_path)) == str(tmp_path / "v2" / MODEL_FILENAME)
+
+
+def test_rollout_scores_are_listed_with_their_version(tmp_path):
+    from model_registry import ROLLOUT_FILENAME, save_rollout
+
+    _version(tmp_path, "v1")
+    register_version("v1", str(tmp_path))
+    summary = {"survival_frames": {"mean": 812.5}, "reward": {"mean": -3.0}}
+    save_rollout("v1", summary, str(tmp_path))
+
+    entry = list_versions(str(tmp_path))[0]
+    assert entry["rollout"] == summary
+    assert entry["metrics"] == {"f1_macro": 0.5, "survival_frames": 812.5, "reward": -3.0}
+    assert entry["artifacts"][ROLLOUT_FILENAME]["path"] == str(tmp_path / "v1" / ROLLOUT_FILENAME)
@@ -0,0 +1,65 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+from policy_compiler import CompiledPolicy, verify, compile_model
+
+ACTIONS = np.array(["flee", "seek_food", "rest", "wander", "idle"])
+
+
+def _data(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 100, (n, 5))
+    # Values that round differently in float32, right next to split points
+    X[: n // 4] = np.round(X[: n // 4], 1) + rng.choice([-1e-7, 0, 1e-7], (n // 4, 5))
+    y = ACTIONS[(X[:, 0] > 70) + 2 * (X[:, 4] > 60) + (X[:, 1] < 20)]
+    return X, y
+
+
+def _check(model, X, tmp_path):
+    compiled = CompiledPolicy.from_model(model)
+    expected = model.predict(X)
+    assert np.array_equal(compiled.predict(X), expected)
+    assert [compiled.predict_one(row) for row in X[:500]] == expected[:500].tolist()
+    assert verify(compiled, model, X, scalar_rows=100) == 0
+
+    path = tmp_path / "policy_tree.json"
+    compiled.save(path)
+    assert np.array_equal(CompiledPolicy.load(path).predict(X), expected)
+
+
+def test_compiled_tree_matches_sklearn(tmp_path):
+    X, y = _data()
+    _check(DecisionTreeClassifier(random_state=0).fit(X[:2000], y[:2000]), X, tmp_path)
+
+
+def test_compiled_forest_matches_sklearn(tmp_path):
+    X, y = _data()
+    model = RandomForestClassifier(n_estimators=8, max_depth=8, random_state=0).fit(X[:2000], y[:2000])
+    _check(model, X, tmp_path)
+    assert np.allclose(CompiledPolicy.from_model(model).predict_proba(X), model.predict_proba(X))
+
+
+def test_verify_counts_mismatches():
+    X, y = _data()
+    model = DecisionTreeClassifier(max_depth=3, random_state=0).fit(X, y)
+    other = CompiledPolicy.from_model(DecisionTreeClassifier(max_depth=1, random_state=0).fit(X, y))
+    assert verify(other, model, X) == int(np.sum(other.predict(X) != model.predict(X))) > 0
+
+
+def test_compile_model_checks_a_bounded_sample_of_the_log(tmp_path):
+    import json
+    import pickle
+    from policy_engine import FEATURE_NAMES, load_policy, policy_source
+
+    X, y = _data()
+    model_path = tmp_path / "policy_model.pkl"
+    model_path.write_bytes(pickle.dumps(DecisionTreeClassifier(random_state=0).fit(X, y)))
+    log = tmp_path / "agent_log.jsonl"
+    log.write_text("".join(json.dumps({"frame": i, "state": dict(zip(FEATURE_NAMES, row)), "action": "idle", "reward": 0})
+                           + "\n" for i, row in enumerate(X.tolist())))
+
+    assert policy_source(str(model_path)) == str(model_path)
+    out = compile_model(str(model_path), [str(log)], max_rows=1000)
+    assert policy_source(str(model_path)) == out
+    model = pickle.loads(model_path.read_bytes())
+    assert np.array_equal(load_policy(str(model_path)).predict(X), model.predict(X))
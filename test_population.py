@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from prey import PreyPopulation
+
+
+def test_stale_view_does_not_touch_other_entities():
+    prey = PreyPopulation(3, rng=np.random.default_rng(0))
+    removed = prey[2]
+    last_x, last_y = removed.x, removed.y
+    prey.remove(removed)
+    survivors = prey.positions().copy()
+
+    assert not removed.alive
+    assert (removed.x, removed.y) == (last_x, last_y)
+    assert removed.direction is None
+    assert removed.speed is None
+    assert removed.breed_timer is None
+    with pytest.raises(ValueError):
+        removed.x = 0
+    with pytest.raises(ValueError):
+        removed.y = 0
+    assert np.array_equal(prey.positions(), survivors)
+
+
+def test_view_follows_its_entity_after_others_are_removed():
+    prey = PreyPopulation(3, rng=np.random.default_rng(0))
+    view = prey[2]
+    prey.kill([0])
+    view.x = 42
+    assert prey.x[1] == 42 and view.x == 42
@@ -0,0 +1,40 @@
+import math
+import numpy as np
+from predator import assign_targets
+
+
+def _assign_by_loop(prey_positions, predator_positions):
+    """The per-predator loop assign_targets replaced."""
+    targets = []
+    for me in predator_positions:
+        def is_my_target(p):
+            mine = math.dist(me, p)
+            return all(math.dist(other, p) >= mine for other in predator_positions)
+        candidates = [i for i, p in enumerate(prey_positions) if is_my_target(p)]
+        targets.append(min(candidates, key=lambda i: math.dist(me, prey_positions[i])) if candidates else -1)
+    return targets
+
+
+def test_assign_targets_matches_per_predator_loop():
+    rng = np.random.default_rng(0)
+    for n_prey, n_predators in [(20, 3), (50, 10), (1, 4), (5, 1)]:
+        for _ in range(20):
+            prey = rng.uniform(0, 800, (n_prey, 2))
+            predators = rng.uniform(0, 800, (n_predators, 2))
+            target, dist = assign_targets(prey, predators)
+            assert target.tolist() == _assign_by_loop(prey.tolist(), predators.tolist())
+            hunting = target >= 0
+            assert np.allclose(dist[hunting], np.hypot(*(prey[target[hunting]] - predators[hunting]).T))
+
+
+def test_shared_prey_is_a_candidate_for_every_tied_predator():
+    prey = np.array([[100.0, 100.0]])
+    predators = np.array([[90.0, 100.0], [110.0, 100.0]])
+    target, _ = assign_targets(prey, predators)
+    assert target.tolist() == [0, 0] == _assign_by_loop(prey.tolist(), predators.tolist())
+
+
+def test_no_prey_or_predators():
+    target, dist = assign_targets(np.empty((0, 2)), np.zeros((3, 2)))
+    assert target.tolist() == [-1, -1, -1] and np.isinf(dist).all()
+    assert len(assign_targets(np.zeros((3, 2)), np.empty((0, 2)))[0]) == 0
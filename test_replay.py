@@ -0,0 +1,60 @@
+import numpy as np
+from replay import ReplayRecorder, ReplayReader, QUANT
+from world import World
+
+
+def _quantised(population):
+    return population.id.tolist(), (np.rint(population.x * QUANT) / QUANT).tolist(), \
+        (np.rint(population.y * QUANT) / QUANT).tolist()
+
+
+def _record(path, frames, keyframe_interval, close=True):
+    # Enough prey and fast enough breeding that entities die and are born mid-chunk
+    world = World(num_prey=60, num_predators=8, seed=5)
+    world.recorder = ReplayRecorder(str(path), keyframe_interval=keyframe_interval)
+    expected = []
+    for _ in range(frames):
+        world.step()
+        agents = world.agents
+        expected.append({
+            "frame": world.frame,
+            "prey": _quantised(world.prey),
+            "predators": _quantised(world.predators),
+            "target_id": world.predators.target_id.tolist(),
+            "agent": (float(np.float32(agents.x[0])), float(np.float32(agents.health[0])), str(agents.emotion[0])),
+        })
+    if close:
+        world.recorder.close()
+    else:
+        world.recorder._file.close()
+    return expected
+
+
+def _assert_frame(replay_frame, expected):
+    assert replay_frame.frame == expected["frame"]
+    for name in ("prey", "predators"):
+        population = getattr(replay_frame, name)
+        assert (population.id.tolist(), population.x.tolist(), population.y.tolist()) == expected[name]
+    assert replay_frame.predators.target_id.tolist() == expected["target_id"]
+    agent = replay_frame.agent
+    assert (agent.x, agent.health, agent.emotion) == expected["agent"]
+
+
+def test_seek_matches_recorded_frames(registry, tmp_path):
+    expected = _record(tmp_path / "run.replay", 250, keyframe_interval=40)
+    assert len(expected[0]["prey"][0]) != len(expected[-1]["prey"][0])
+
+    reader = ReplayReader(str(tmp_path / "run.replay"))
+    assert len(reader) == 250 and len(reader.index["chunks"]) == 7
+    order = np.random.default_rng(0).permutation(250)
+    for i in [0, 249, 40, 39, 41, 0, *order]:
+        _assert_frame(reader[i], expected[i])
+
+
+def test_unclosed_recording_is_reindexed(registry, tmp_path):
+    expected = _record(tmp_path / "run.replay", 130, keyframe_interval=50, close=False)
+    reader = ReplayReader(str(tmp_path / "run.replay"))
+    # The last, unfinished chunk was never written
+    assert len(reader) == 100
+    for i in (99, 0, 50, 75):
+        _assert_frame(reader[i], expected[i])
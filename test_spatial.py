@@ -0,0 +1,42 @@
+import numpy as np
+from spatial import SpatialGrid
+
+
+def _grid(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform(0, 800, (n, 2))
+    radii = rng.uniform(2, 12, n)
+    return SpatialGrid().build(positions, radii), positions, radii, rng
+
+
+def test_query_radius_matches_brute_force():
+    grid, positions, _, rng = _grid()
+    for x, y, r in zip(*rng.uniform(-50, 850, (2, 50)), rng.uniform(0, 200, 50)):
+        idx, dist = grid.query_radius(x, y, r)
+        expected = np.hypot(positions[:, 0] - x, positions[:, 1] - y)
+        assert np.array_equal(np.sort(idx), np.flatnonzero(expected <= r))
+        assert np.allclose(dist, expected[idx])
+
+
+def test_query_contacts_matches_brute_force():
+    grid, positions, radii, rng = _grid()
+    for x, y, r in zip(*rng.uniform(0, 800, (2, 50)), rng.uniform(1, 30, 50)):
+        expected = np.flatnonzero(np.hypot(positions[:, 0] - x, positions[:, 1] - y) < r + radii)
+        assert np.array_equal(np.sort(grid.query_contacts(x, y, r)), expected)
+
+
+def test_nearest_matches_brute_force():
+    grid, positions, _, rng = _grid(n=40)
+    mask = rng.random(40) < 0.3
+    for x, y in zip(*rng.uniform(-100, 900, (2, 50))):
+        dist = np.hypot(positions[:, 0] - x, positions[:, 1] - y)
+        assert grid.nearest(x, y) == (int(np.argmin(dist)), float(dist.min()))
+        masked = np.where(mask, dist, np.inf)
+        assert grid.nearest(x, y, mask=mask) == (int(np.argmin(masked)), float(masked.min()))
+
+
+def test_empty_grid():
+    grid = SpatialGrid()
+    assert len(grid.query_radius(10, 10, 100)[0]) == 0
+    assert grid.nearest(10, 10) == (-1, float("inf"))
+    assert grid.nearest(10, 10, mask=np.zeros(0, dtype=bool)) == (-1, float("inf"))
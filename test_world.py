@@ -0,0 +1,32 @@
+import numpy as np
+import agent
+import world as world_module
+from world import World
+
+
+def _run(monkeypatch, direct_pairs, frames=400, **world_args):
+    monkeypatch.setattr(agent, "DIRECT_PAIRS", direct_pairs)
+    monkeypatch.setattr(world_module, "DIRECT_PAIRS", direct_pairs)
+    world = World(seed=7, **world_args)
+    for _ in range(frames):
+        world.step()
+    return world
+
+
+def test_direct_and_grid_paths_agree(registry, monkeypatch):
+    for world_args in ({}, {"num_prey": 60, "num_predators": 6, "num_agents": 8}):
+        direct = _run(monkeypatch, float("inf"), **world_args)
+        grid = _run(monkeypatch, -1, **world_args)
+        for name in ("agents", "prey", "predators"):
+            a, b = getattr(direct, name).columns(), getattr(grid, name).columns()
+            for column in a:
+                assert np.array_equal(a[column], b[column]), (world_args, name, column)
+
+
+def test_seeded_worlds_repeat(registry):
+    a, b = World(seed=11), World(seed=11)
+    for _ in range(200):
+        a.step()
+        b.step()
+    assert np.array_equal(a.prey.positions(), b.prey.positions())
+    assert np.array_equal(a.agents.positions(), b.agents.positions())
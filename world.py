@@ -1 +1,185 @@
-#world
\ No newline at end of file
+# world.py
+
+import argparse
+import time
+import numpy as np
+from settings import *
+from agent import AgentPopulation
+from prey import PreyPopulation
+from predator import PredatorPopulation
+from spatial import SpatialGrid, DIRECT_PAIRS, pairwise_distances
+from model_watcher import ModelWatcher
+from action_log import ActionLogWriter
+from columnar_log import ColumnarLogWriter
+from telemetry import TelemetryPublisher, frame_sample
+from profiler import FrameProfiler
+from replay import ReplayRecorder
+
+
+class World:
+    """
+    Headless simulation state: the agent, prey and predators plus the
+    interaction rules between them. Stepping never touches the display,
+    so it runs as fast as the CPU allows; main.py draws on top of it.
+
+    Every random draw comes from one NumPy Generator seeded with `seed`, so
+    the same seed, policy model and frame count reproduce a run (and its
+    logs) exactly. A seed of None gives a fresh run each time.
+    """
+
+    def __init__(self, num_prey=INITIAL_PREY, num_predators=INITIAL_PREDATORS, num_agents=1, seed=SEED):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.agents = AgentPopulation(num_agents, rng=self.rng)
+        self.agent = self.agents[0]  # the agent main.py follows
+        self.prey = PreyPopulation(num_prey, rng=self.rng)
+        self.predators = PredatorPopulation(num_predators, rng=self.rng)
+        self.frame = 0
+
+        # Rebuilt each step; indices match rows of the populations above
+        self.prey_grid = SpatialGrid()
+        self.predator_grid = SpatialGrid()
+
+        # Attach a TelemetryPublisher to stream per-frame aggregates
+        self.telemetry = None
+        # Attach a FrameProfiler (profiler.attach(world)) to time each stage
+        self.profiler = None
+        # Attach a ReplayRecorder to record every frame for main.py --replay
+        self.recorder = None
+
+    def step(self):
+        started = time.perf_counter()
+        profiler = self.profiler
+        self.frame += 1
+
+        self.prey.update()
+        if profiler is not None:
+            profiler.lap("prey")
+        self.predators.update(self.prey)
+        if profiler is not None:
+            profiler.lap("predators")
+
+        # Predator eats prey on contact. Small worlds compare every pair
+        # directly and leave the agents to do the same, without grids.
+        prey, predators = self.prey, self.predators
+        if len(prey) * len(predators) <= DIRECT_PAIRS:
+            contact = pairwise_distances(predators.x, predators.y, prey.x, prey.y) < predators.radius[:, None] + prey.radius
+            eaten = np.flatnonzero(contact.any(axis=0))
+            if len(eaten):
+                prey.kill(eaten)
+            prey_grid = predator_grid = None
+        else:
+            self.prey_grid.build_from(prey)
+            eaten = [
+                self.prey_grid.query_contacts(x, y, r)
+                for x, y, r in zip(predators.x, predators.y, predators.radius)
+            ]
+            if eaten:
+                eaten = np.unique(np.concatenate(eaten))
+            if len(eaten):
+                prey.kill(eaten)
+                self.prey_grid.build_from(prey)
+            self.predator_grid.build_from(predators)
+            prey_grid, predator_grid = self.prey_grid, self.predator_grid
+
+        if profiler is not None:
+            profiler.lap("collision")
+        self.agents.update(prey, predators, prey_grid, predator_grid)
+
+        # Occasionally spawn new prey
+        if self.rng.random() < PREY_SPAWN_CHANCE and len(self.prey) < MAX_SPAWNED_PREY:
+            self.prey.spawn(1)
+
+        if self.telemetry is not None:
+            self.telemetry.publish(frame_sample(self, time.perf_counter() - started))
+        if profiler is not None:
+            profiler.lap("spawn")
+        if self.recorder is not None:
+            self.recorder.record(self)
+            if profiler is not None:
+                profiler.lap("record")
+
+    def run(self, frames):
+        """Step the world `frames` times and return the achieved frames/sec."""
+        start = time.perf_counter()
+        profiler = self.profiler
+        for _ in range(frames):
+            if profiler is not None:
+                profiler.begin_frame()
+            self.step()
+            if profiler is not None:
+                profiler.end_frame()
+        elapsed = time.perf_counter() - start
+        return frames / elapsed if elapsed > 0 else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the simulation headless, without rendering.")
+    parser.add_argument("--frames", type=int, default=5000, help="number of frames to simulate")
+    parser.add_argument("--prey", type=int, default=INITIAL_PREY, help="initial prey count")
+    parser.add_argument("--predators", type=int, default=INITIAL_PREDATORS, help="predator count")
+    parser.add_argument("--agents", type=int, default=1, help="number of agents")
+    parser.add_argument("--seed", type=int, default=SEED, help="random seed; the same seed reproduces a run exactly")
+    parser.add_argument("--max-prey", type=int, default=MAX_PREY, help="population cap for breeding")
+    parser.add_argument("--watch-models", action="store_true", help="hot-swap newly trained models while running")
+    parser.add_argument("--log", default=None, help="stream the agents' action log to this JSON Lines file (or columnar .cols directory)")
+    parser.add_argument("--telemetry", action="store_true",
+                        help=f"stream live aggregates to the dashboard server on udp://{TELEMETRY_HOST}:{TELEMETRY_PORT}")
+    parser.add_argument("--load-snapshot", default=None, help="start from a world snapshot instead of a fresh world (--seed then reseeds it)")
+    parser.add_argument("--save-snapshot", default=None, help="write a snapshot of the world after the run")
+    parser.add_argument("--record", default=None, help="record every frame to this replay file (watch it with main.py --replay)")
+    parser.add_argument("--profile", action="store_true", help="print per-stage frame time percentiles")
+    parser.add_argument("--trace", default=None, help="write a Chrome trace of every frame's stages to this JSON file")
+    parser.add_argument("--log-rotate-mb", type=float, default=None, help="start a new log segment after this many MB")
+    args = parser.parse_args()
+
+    if args.load_snapshot:
+        import snapshot
+        world = snapshot.load(args.load_snapshot)
+        if args.seed is not None:
+            snapshot.reseed(world, args.seed)
+        print(f"📸 Restored frame {world.frame} from '{args.load_snapshot}'")
+    else:
+        world = World(num_prey=args.prey, num_predators=args.predators, num_agents=args.agents, seed=args.seed)
+    if args.watch_models:
+        ModelWatcher().start()
+    if args.log:
+        max_bytes = int(args.log_rotate_mb * 1024 * 1024) if args.log_rotate_mb else None
+        if args.log.endswith(".cols"):
+            world.agents.log_writer = ColumnarLogWriter(args.log)
+        else:
+            world.agents.log_writer = ActionLogWriter(args.log, max_bytes=max_bytes)
+    if args.telemetry:
+        world.telemetry = TelemetryPublisher()
+    if args.record:
+        world.recorder = ReplayRecorder(args.record, meta={"seed": world.seed})
+    if args.profile or args.trace:
+        profiler = FrameProfiler(window=args.frames, trace=bool(args.trace)).attach(world)
+    if not args.load_snapshot:
+        world.prey.max_size = max(args.max_prey, args.prey)
+    fps = world.run(args.frames)
+    print(f"⏱️ Simulated {args.frames} frames at {fps:.0f} frames/sec "
+          f"(agent: {world.agent.emotion}, prey: {len(world.prey)})")
+
+    if args.record:
+        size = world.recorder.close()
+        print(f"🎞️ Recorded {world.recorder.frames} frames to '{args.record}' ({size / 1024:.0f} KiB)")
+    if args.save_snapshot:
+        import snapshot
+        size = snapshot.save(world, args.save_snapshot)
+        print(f"📸 Saved frame {world.frame} to '{args.save_snapshot}' ({size} bytes)")
+    if args.profile or args.trace:
+        print("\n".join(profiler.report()))
+    if args.trace:
+        events = profiler.export_trace(args.trace)
+        print(f"🧭 Wrote {events} trace events to '{args.trace}'")
+
+    if world.telemetry:
+        world.telemetry.close()
+    if args.log:
+        world.agents.log_writer.close()
+        print(f"[LOG] Wrote {world.agents.log_writer.rows_written} entries to '{args.log}'")
+
+
+if __name__ == "__main__":
+    main()